@@ -0,0 +1,16 @@
+"""Compile src/agents/_formatters.py to a C extension in place with mypyc.
+
+Usage (from the repository root): python build_formatters.py
+"""
+
+from mypyc.build import mypycify
+from setuptools import setup
+
+setup(
+    name="document-research-agent-formatters",
+    # Explicit and empty so setuptools does not auto-detect src/ as the package root
+    packages=[],
+    # Type errors elsewhere in the package must not block compiling this one module
+    ext_modules=mypycify(["--follow-imports=silent", "src/agents/_formatters.py"]),
+    script_args=["build_ext", "--inplace"],
+)
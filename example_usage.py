@@ -5,6 +5,8 @@ Example usage script for the Document Research Agent
 This script demonstrates various ways to use the research agent programmatically.
 """
 
+import asyncio
+
 from dotenv import load_dotenv
 from src.workflow import Workflow
 from src.utils.config import Config
@@ -15,7 +17,7 @@ load_dotenv()
 # Set up logging
 logger = setup_logger("example_usage")
 
-def main():
+async def main():
     """Main function demonstrating various usage patterns."""
     
     # Initialize the workflow
@@ -24,21 +26,34 @@ def main():
     
     # Perform health check
     print("🔍 Performing health check...")
-    health = workflow.health_check()
+    health = await workflow.health_check_async()
     print(f"System status: {health['status']}")
     
     if health['status'] != 'healthy':
         print("⚠️  System is not healthy. Check your configuration.")
         return
     
+    # Examples 1, 4 and 5 are independent of each other, so run them concurrently
+    query = "Python web frameworks"
+    result, category_results, company_details = await asyncio.gather(
+        workflow.arun(query, max_results=5, analyze=False),
+        workflow.asearch_by_categories(["CI/CD", "Monitoring"], max_results=3),
+        workflow.aresearch_company("Docker", "https://www.docker.com")
+    )
+    
+    # The analysis of Example 1 and Examples 2 and 3 come from one full report;
+    # later compare_companies/get_recommendations calls for these companies reuse it
+    report = await workflow.afull_report(
+        result.companies,
+        query,
+        user_requirements="I need a free, open-source solution with good documentation and active community support"
+    )
+    
     # Example 1: Basic research
     print("\n" + "="*60)
     print("📊 Example 1: Basic Research")
     print("="*60)
     
-    query = "Python web frameworks"
-    result = workflow.run(query, max_results=5)
-    
     print(f"Query: {result.query}")
     print(f"Found {result.total_results} results in {result.search_time:.2f} seconds")
     
@@ -51,7 +66,7 @@ def main():
             print(f"   Description: {company.description[:100]}...")
     
     print(f"\n📋 Analysis:")
-    print(result.analysis)
+    print(report["analysis"])
     
     # Example 2: Company comparison
     print("\n" + "="*60)
@@ -59,40 +74,31 @@ def main():
     print("="*60)
     
     if len(result.companies) > 1:
-        comparison = workflow.compare_companies(
-            result.companies, 
-            criteria=["pricing_model", "is_open_source", "api_available"]
-        )
-        print(comparison)
+        print(report["comparison"])
     
     # Example 3: Personalized recommendations
     print("\n" + "="*60)
     print("📊 Example 3: Personalized Recommendations")
     print("="*60)
     
-    recommendations = workflow.get_recommendations(
-        result.companies,
-        user_requirements="I need a free, open-source solution with good documentation and active community support"
-    )
-    print(recommendations)
+    print(report["recommendations"])
     
     # Example 4: Category-specific search
     print("\n" + "="*60)
     print("📊 Example 4: Category-specific Search")
     print("="*60)
     
-    category_result = workflow.search_by_category("CI/CD", max_results=3)
-    print(f"Found {category_result.total_results} CI/CD tools:")
-    
-    for company in category_result.companies:
-        print(f"- {company.name}: {company.description}")
+    for category, category_result in zip(["CI/CD", "Monitoring"], category_results):
+        print(f"Found {category_result.total_results} {category} tools:")
+        
+        for company in category_result.companies:
+            print(f"- {company.name}: {company.description}")
     
     # Example 5: Research specific company
     print("\n" + "="*60)
     print("📊 Example 5: Research Specific Company")
     print("="*60)
     
-    company_details = workflow.research_company("Docker", "https://www.docker.com")
     if company_details:
         print(f"Company: {company_details.name}")
         print(f"Website: {company_details.website}")
@@ -132,7 +138,7 @@ if __name__ == "__main__":
     print("="*60)
     
     try:
-        main()
+        asyncio.run(main())
         demonstrate_error_handling()
     except KeyboardInterrupt:
         print("\n👋 Interrupted by user")
@@ -53,6 +53,8 @@ def main():
                 print("-" * 40)
                 print(result.analysis)
 
+    workflow.close()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
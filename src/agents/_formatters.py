@@ -0,0 +1,52 @@
+"""
+Prompt formatters for the analysis agent.
+
+Kept free of lambdas and dynamic typing so the module can be compiled to a C
+extension with mypyc (run `python build_formatters.py` from the repository
+root); when no compiled build is present this pure-Python module is imported
+instead.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.models.company import Company
+
+
+def format_companies_summary(companies: Sequence[Company]) -> str:
+    """Create a structured summary of companies for analysis."""
+
+    lines: List[str] = []
+    for i, company in enumerate(companies, 1):
+        parts: List[Optional[str]] = [
+            f"\n{i}. **{company.name}**",
+            f"   - Website: {company.website or 'N/A'}",
+            f"   - Description: {company.description or 'N/A'}",
+            f"   - Pricing: {company.pricing_model or 'N/A'}",
+            f"   - Open Source: {'Yes' if company.is_open_source else 'No'}",
+            f"   - Tech Stack: {', '.join(company.tech_stack[:5])}" if company.tech_stack else None,
+            f"   - Language Support: {', '.join(company.language_support[:5])}" if company.language_support else None,
+            f"   - API Available: {'Yes' if company.api_available else 'No'}" if company.api_available is not None else None,
+            f"   - Integrations: {', '.join(company.integration_capabilities[:5])}" if company.integration_capabilities else None,
+            f"   - Category: {company.category}" if company.category else None
+        ]
+        lines.extend(p for p in parts if p is not None)
+
+    return "\n".join(lines)
+
+
+def format_comparison_data(comparison_data: List[Dict[str, Any]]) -> str:
+    """Format comparison data for LLM analysis."""
+
+    lines: List[str] = []
+    for data in comparison_data:
+        lines.extend([
+            f"\n**{data['name']}:**",
+            f"- Pricing: {data['pricing_model']}",
+            f"- Open Source: {'Yes' if data['is_open_source'] else 'No'}",
+            f"- API Available: {data['api_available']}",
+            f"- Tech Stack: {', '.join(data['tech_stack'][:3]) if data['tech_stack'] else 'N/A'}",
+            f"- Language Support: {', '.join(data['language_support'][:3]) if data['language_support'] else 'N/A'}",
+            f"- Integrations: {', '.join(data['integration_capabilities'][:3]) if data['integration_capabilities'] else 'N/A'}"
+        ])
+
+    return "\n".join(lines)
@@ -1,94 +1,164 @@
-import os
 import logging
-from typing import List, Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
+from functools import lru_cache
+from typing import List, Dict, Any, Iterator
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel
 
 from src.models.company import Company
+from src.agents._formatters import format_companies_summary, format_comparison_data
+from src.utils.llm_client import get_llm
+from src.utils.llm_cache import cached_invoke, cached_stream
+from src.utils.structured_output import json_schema_response_format
 
 logger = logging.getLogger(__name__)
 
+# Invariant prompt prefixes, sent first as the system message so repeated calls
+# share a cacheable prefix; only per-call data (companies, query, requirements)
+# goes into the human message.
+ANALYSIS_SYSTEM_PROMPT = "You are an expert technical analyst for developer tools.\n"
+
+ANALYSIS_INSTRUCTIONS = """
+Analyze the given research results. Return, concisely:
+1) key findings and trends
+2) top recommendations and why
+3) comparison: pricing, open source vs proprietary, capabilities, integrations
+4) best use case per option
+5) what to consider when choosing
+Be practical and actionable.
+"""
+
+COMPARISON_INSTRUCTIONS = """
+Compare the given tools on the given criteria. Return a structured comparison:
+1) strengths and weaknesses per option
+2) best use cases
+3) key differentiators
+4) recommendation per scenario
+"""
+
+RECOMMENDATION_INSTRUCTIONS = """
+Recommend from the given options for the user's requirements. Return:
+1) top 3 picks with reasoning
+2) pros and cons of each
+3) implementation, budget and scalability considerations
+"""
+
+FULL_REPORT_INSTRUCTIONS = f"""
+Write three sections for the given research results and user requirements.
+analysis:{ANALYSIS_INSTRUCTIONS}
+comparison (on pricing, open source, API availability and tech stack):{COMPARISON_INSTRUCTIONS}
+recommendations:{RECOMMENDATION_INSTRUCTIONS}"""
+
+
+class _FullReport(BaseModel):
+    """Structured LLM output for a combined analysis/comparison/recommendations prompt."""
+    
+    analysis: str
+    comparison: str
+    recommendations: str
+
+
+FULL_REPORT_RESPONSE_FORMAT = json_schema_response_format('full_report', _FullReport.model_json_schema())
+
+FULL_REPORT_FAILED = {
+    "analysis": "Analysis failed due to an error.",
+    "comparison": "Comparison failed due to an error.",
+    "recommendations": "Recommendations failed due to an error."
+}
+
+
+class _CompaniesFingerprint:
+    """Hashable identity of a sequence of companies.
+    
+    Company is frozen, so the same instances always render the same summary.
+    The fingerprint keeps the instances alive while it is cached, so their ids
+    cannot be reused by other objects.
+    """
+    
+    __slots__ = ('companies', '_ids')
+    
+    def __init__(self, companies: List[Company]):
+        self.companies = tuple(companies)
+        self._ids = tuple(map(id, self.companies))
+    
+    def __hash__(self) -> int:
+        return hash(self._ids)
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _CompaniesFingerprint) and self._ids == other._ids
+
+
+@lru_cache(maxsize=128)
+def _companies_summary(fingerprint: _CompaniesFingerprint) -> str:
+    """Render the companies summary, memoized so analysis and recommendations share it."""
+    
+    return format_companies_summary(fingerprint.companies)
+
 
 class AnalysisAgent:
     """Agent responsible for analyzing research results and providing recommendations."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.3,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        self.llm = get_llm("gpt-4o-mini", 0.3, max_tokens=600)
+        # Three sections in one response need more room than the default output cap
+        self._report_llm = self.llm.bind(response_format=FULL_REPORT_RESPONSE_FORMAT, max_tokens=1800)
     
-    def analyze_companies(self, companies: List[Company], query: str) -> str:
-        """Analyze a list of companies and generate insights and recommendations."""
+    def analyze_companies(self, companies: List[Company], query: str, raise_on_error: bool = False) -> str:
+        """Analyze a list of companies and generate insights and recommendations.
+        
+        Errors are returned as a failure message, or re-raised if raise_on_error is set.
+        """
         
         if not companies:
             return "No companies found for the given query."
         
-        # Create a summary of the companies
-        companies_summary = self._create_companies_summary(companies)
-        
-        # Generate analysis using LLM
-        prompt = f"""
-        Based on the following research results for the query: "{query}"
-        
-        {companies_summary}
-        
-        Please provide a comprehensive analysis including:
-        
-        1. **Key Findings**: What are the main patterns and trends?
-        2. **Recommendations**: Which tools/companies would you recommend and why?
-        3. **Comparison**: How do these options compare in terms of:
-           - Pricing models
-           - Open source vs proprietary
-           - Technical capabilities
-           - Integration options
-        4. **Use Cases**: What scenarios would each option be best suited for?
-        5. **Considerations**: What factors should developers consider when choosing?
-        
-        Keep the analysis practical and actionable for developers.
-        """
-        
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are an expert technical analyst specializing in developer tools and technology recommendations."),
-                HumanMessage(content=prompt)
-            ])
+            # The LLM calls in this agent use the exact-match cache only: their human messages are mostly
+            # the companies summary, so prompts differing in query, criteria or requirements embed alike
+            response = cached_invoke(self.llm, self._analysis_messages(companies, query))
             
             return response.content
             
         except Exception as e:
+            if raise_on_error:
+                raise
             logger.error(f"Error generating analysis: {str(e)}")
             return "Analysis failed due to an error."
     
-    def _create_companies_summary(self, companies: List[Company]) -> str:
-        """Create a structured summary of companies for analysis."""
+    def analyze_companies_stream(self, companies: List[Company], query: str) -> Iterator[str]:
+        """Stream the analysis of a list of companies as it is generated."""
         
-        summary_lines = []
+        if not companies:
+            yield "No companies found for the given query."
+            return
         
-        for i, company in enumerate(companies, 1):
-            summary_lines.append(f"\n{i}. **{company.name}**")
-            summary_lines.append(f"   - Website: {company.website or 'N/A'}")
-            summary_lines.append(f"   - Description: {company.description or 'N/A'}")
-            summary_lines.append(f"   - Pricing: {company.pricing_model or 'N/A'}")
-            summary_lines.append(f"   - Open Source: {'Yes' if company.is_open_source else 'No'}")
-            
-            if company.tech_stack:
-                summary_lines.append(f"   - Tech Stack: {', '.join(company.tech_stack[:5])}")
-            
-            if company.language_support:
-                summary_lines.append(f"   - Language Support: {', '.join(company.language_support[:5])}")
-            
-            if company.api_available is not None:
-                summary_lines.append(f"   - API Available: {'Yes' if company.api_available else 'No'}")
-            
-            if company.integration_capabilities:
-                summary_lines.append(f"   - Integrations: {', '.join(company.integration_capabilities[:5])}")
+        try:
+            yield from cached_stream(self.llm, self._analysis_messages(companies, query))
             
-            if company.category:
-                summary_lines.append(f"   - Category: {company.category}")
+        except Exception as e:
+            logger.error(f"Error generating analysis: {str(e)}")
+            yield "Analysis failed due to an error."
+    
+    def _analysis_messages(self, companies: List[Company], query: str) -> List[BaseMessage]:
+        """Build the analysis prompt; shared by the blocking and streaming paths so both hit the same cache entry."""
         
-        return "\n".join(summary_lines)
+        # Create a summary of the companies
+        companies_summary = self._create_companies_summary(companies)
+        
+        prompt = f"""
+        Research results for the query: "{query}"
+        
+        {companies_summary}
+        """
+        
+        return [
+            SystemMessage(content=ANALYSIS_SYSTEM_PROMPT + ANALYSIS_INSTRUCTIONS),
+            HumanMessage(content=prompt)
+        ]
+    
+    def _create_companies_summary(self, companies: List[Company]) -> str:
+        """Create a structured summary of companies for analysis."""
+        
+        return _companies_summary(_CompaniesFingerprint(companies))
     
     def compare_companies(self, companies: List[Company], criteria: List[str] = None) -> str:
         """Compare companies based on specific criteria."""
@@ -114,23 +184,15 @@ class AnalysisAgent:
         
         # Create comparison prompt
         prompt = f"""
-        Compare these companies/tools based on the following criteria: {', '.join(criteria)}
+        Criteria: {', '.join(criteria)}
         
         Companies to compare:
         {self._format_comparison_data(comparison_data)}
-        
-        Provide a detailed comparison highlighting:
-        1. Strengths and weaknesses of each option
-        2. Best use cases for each
-        3. Key differentiators
-        4. Recommendations based on different scenarios
-        
-        Format as a clear, structured comparison.
         """
         
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are an expert technical analyst specializing in technology comparisons."),
+            response = cached_invoke(self.llm, [
+                SystemMessage(content=ANALYSIS_SYSTEM_PROMPT + COMPARISON_INSTRUCTIONS),
                 HumanMessage(content=prompt)
             ])
             
@@ -143,18 +205,7 @@ class AnalysisAgent:
     def _format_comparison_data(self, comparison_data: List[Dict[str, Any]]) -> str:
         """Format comparison data for LLM analysis."""
         
-        formatted_lines = []
-        
-        for data in comparison_data:
-            formatted_lines.append(f"\n**{data['name']}:**")
-            formatted_lines.append(f"- Pricing: {data['pricing_model']}")
-            formatted_lines.append(f"- Open Source: {'Yes' if data['is_open_source'] else 'No'}")
-            formatted_lines.append(f"- API Available: {data['api_available']}")
-            formatted_lines.append(f"- Tech Stack: {', '.join(data['tech_stack'][:3]) if data['tech_stack'] else 'N/A'}")
-            formatted_lines.append(f"- Language Support: {', '.join(data['language_support'][:3]) if data['language_support'] else 'N/A'}")
-            formatted_lines.append(f"- Integrations: {', '.join(data['integration_capabilities'][:3]) if data['integration_capabilities'] else 'N/A'}")
-        
-        return "\n".join(formatted_lines)
+        return format_comparison_data(comparison_data)
     
     def generate_recommendations(self, companies: List[Company], user_requirements: str = None) -> str:
         """Generate specific recommendations based on user requirements."""
@@ -165,26 +216,15 @@ class AnalysisAgent:
         requirements_text = f"User requirements: {user_requirements}" if user_requirements else "No specific requirements provided."
         
         prompt = f"""
-        Based on the following companies and user requirements, provide specific recommendations:
-        
         {requirements_text}
         
         Available options:
         {self._create_companies_summary(companies)}
-        
-        Please provide:
-        1. Top 3 recommendations with reasoning
-        2. Pros and cons of each recommended option
-        3. Implementation considerations
-        4. Budget considerations
-        5. Scalability factors
-        
-        Tailor recommendations to the user's specific needs.
         """
         
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are an expert technical consultant providing personalized technology recommendations."),
+            response = cached_invoke(self.llm, [
+                SystemMessage(content=ANALYSIS_SYSTEM_PROMPT + RECOMMENDATION_INSTRUCTIONS),
                 HumanMessage(content=prompt)
             ])
             
@@ -193,3 +233,35 @@ class AnalysisAgent:
         except Exception as e:
             logger.error(f"Error generating recommendations: {str(e)}")
             return "Recommendations failed due to an error."
+    
+    def full_report(self, companies: List[Company], query: str, user_requirements: str = None) -> Dict[str, str]:
+        """Generate the analysis, comparison and recommendations for companies in a single LLM call."""
+        
+        if not companies:
+            return {
+                "analysis": "No companies found for the given query.",
+                "comparison": "No companies to compare.",
+                "recommendations": "No companies available for recommendations."
+            }
+        
+        requirements_text = f"User requirements: {user_requirements}" if user_requirements else "No specific requirements provided."
+        
+        prompt = f"""
+        Research results for the query: "{query}"
+        
+        {requirements_text}
+        
+        {self._create_companies_summary(companies)}
+        """
+        
+        try:
+            response = cached_invoke(self._report_llm, [
+                SystemMessage(content=ANALYSIS_SYSTEM_PROMPT + FULL_REPORT_INSTRUCTIONS),
+                HumanMessage(content=prompt)
+            ], validate=_FullReport.model_validate_json)
+            
+            return _FullReport.model_validate_json(response.content).model_dump()
+            
+        except Exception as e:
+            logger.error(f"Error generating full report: {str(e)}")
+            return dict(FULL_REPORT_FAILED)
@@ -1,34 +1,118 @@
-import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
+from typing import List, Dict, Any, Optional, Tuple
 from langchain.agents import initialize_agent, AgentType
-from langchain.schema import HumanMessage, SystemMessage
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel, ValidationError
 
-from src.models.company import Company
+from src.models.company import Company, COMPANY_JSON_SCHEMA
+from src.utils.llm_client import get_llm
+from src.utils.structured_output import json_schema_response_format
+from src.utils.llm_cache import acached_invoke, cached_invoke
 from src.tools.web_scraper import WebScraperTool
+from src.utils.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Invariant prompt prefixes, sent first so repeated calls share a cacheable prefix.
+RESEARCH_SYSTEM_PROMPT = "You are a research assistant for developer tools and companies.\n"
+
+COMPANY_GENERATION_INSTRUCTIONS = """
+For each query, list the requested number of real companies/tools, in query order.
+Be factual. pricing_model is one of free, paid, freemium, open_source.
+At most 5 tech_stack, language_support and integration_capabilities entries. Use null when unknown.
+"""
+
+COMPANY_DETAILS_INSTRUCTIONS = """
+Describe the given company/tool factually. Use null when unknown.
+"""
+
+
+class _CompanyBatch(BaseModel):
+    """Structured LLM output for a batched company-generation prompt."""
+    
+    results: List[List[Company]]
+
+
+COMPANIES_RESPONSE_FORMAT = json_schema_response_format('companies', {
+    'type': 'object',
+    'properties': {
+        'results': {'type': 'array', 'items': {'type': 'array', 'items': COMPANY_JSON_SCHEMA}}
+    }
+})
+COMPANY_RESPONSE_FORMAT = json_schema_response_format('company', COMPANY_JSON_SCHEMA)
+
 
 class ResearchAgent:
     """Agent responsible for researching companies and developer tools."""
     
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.1,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
-        self.web_scraper = WebScraperTool()
+    def __init__(self, config: Optional[Config] = None):
+        self.llm = get_llm("gpt-4o-mini", 0.1)
+        # JSON-mode views of the same client, one per response shape
+        self._companies_llm = self.llm.bind(response_format=COMPANIES_RESPONSE_FORMAT)
+        self._company_llm = self.llm.bind(response_format=COMPANY_RESPONSE_FORMAT)
+        self.web_scraper = WebScraperTool(config=config)
         
     def search_companies(self, query: str, max_results: int = 10) -> List[Company]:
         """Search for companies/tools based on a query."""
         
+        return asyncio.run(self.asearch_companies(query, max_results))
+    
+    async def asearch_companies(self, query: str, max_results: int = 10) -> List[Company]:
+        """Search for companies/tools, running the web scrape and the LLM top-up concurrently."""
+        
+        logger.info(f"Searching for companies with query: {query}")
+        
+        llm_task = asyncio.create_task(self._agenerate_companies_with_llm(query, max_results))
+        
+        companies = []
+        
+        # Process scraped results as each site finishes instead of waiting for the slowest one
+        async for result in self.web_scraper.stream_search_and_scrape(query, max_results):
+            if result.get('success'):
+                company = self._process_scraped_data(result)
+                if company:
+                    companies.append(company)
+        
+        generated_companies = await llm_task
+        
+        # Scraped results take precedence over LLM-generated ones for the same website
+        return self._merge_companies(companies, generated_companies)[:max_results]
+    
+    def search_companies_batch(self, queries: List[str], max_results: int = 10) -> List[List[Company]]:
+        """Search for companies/tools for several queries, topping up all of them with a single LLM call."""
+        
+        return asyncio.run(self.asearch_companies_batch(queries, max_results))
+    
+    async def asearch_companies_batch(self, queries: List[str], max_results: int = 10) -> List[List[Company]]:
+        """Async version of search_companies_batch that scrapes the queries concurrently."""
+        
+        # One bound for the whole batch, so all the queries together stay within max_scraping_concurrent
+        semaphore = asyncio.Semaphore(self.web_scraper.config.max_scraping_concurrent)
+        results = list(await asyncio.gather(
+            *(self._scrape_companies(query, max_results, semaphore) for query in queries)
+        ))
+        
+        # If we don't have enough results, use LLM to generate the missing ones for every query at once
+        deficits = [
+            (index, query, max_results - len(companies))
+            for index, (query, companies) in enumerate(zip(queries, results))
+            if len(companies) < max_results
+        ]
+        if deficits:
+            generated = await self.agenerate_companies_batch([(query, count) for _, query, count in deficits])
+            for (index, _, _), additional_companies in zip(deficits, generated):
+                results[index].extend(additional_companies)
+        
+        return [companies[:max_results] for companies in results]
+    
+    async def _scrape_companies(self, query: str, max_results: int, semaphore: asyncio.Semaphore) -> List[Company]:
+        """Scrape the web for a query and return the companies found."""
+        
         logger.info(f"Searching for companies with query: {query}")
         
         # First, try to get structured data from web scraping
-        scraped_results = self.web_scraper.search_and_scrape(query, max_results)
+        scraped_results = await self.web_scraper.asearch_and_scrape(query, max_results, semaphore)
         
         companies = []
         
@@ -39,12 +123,7 @@ class ResearchAgent:
                 if company:
                     companies.append(company)
         
-        # If we don't have enough results, use LLM to generate more
-        if len(companies) < max_results:
-            additional_companies = self._generate_companies_with_llm(query, max_results - len(companies))
-            companies.extend(additional_companies)
-        
-        return companies[:max_results]
+        return companies
     
     def _process_scraped_data(self, scraped_data: Dict[str, Any]) -> Optional[Company]:
         """Process scraped data into a Company object."""
@@ -72,53 +151,90 @@ class ResearchAgent:
             logger.error(f"Error processing scraped data: {str(e)}")
             return None
     
+    @staticmethod
+    def _merge_companies(companies: List[Company], additional_companies: List[Company]) -> List[Company]:
+        """Append additional companies whose website (or name, if there is none) is not already present."""
+        
+        def identity(company: Company) -> str:
+            return (company.website or company.name).lower().rstrip('/')
+        
+        seen = {identity(company) for company in companies}
+        merged = list(companies)
+        for company in additional_companies:
+            if identity(company) not in seen:
+                seen.add(identity(company))
+                merged.append(company)
+        return merged
+    
     def _generate_companies_with_llm(self, query: str, count: int) -> List[Company]:
         """Use LLM to generate company information when scraping is insufficient."""
         
-        prompt = f"""
-        You are a research assistant specializing in developer tools and companies.
-        
-        Generate {count} companies/tools related to: "{query}"
-        
-        For each company, provide:
-        - name: Company/tool name
-        - website: Official website URL
-        - description: Brief description (2-3 sentences)
-        - pricing_model: one of [free, paid, freemium, open_source]
-        - is_open_source: true/false
-        - tech_stack: list of technologies used (max 5)
-        - language_support: programming languages supported (max 5)
-        - api_available: true/false/null
-        - integration_capabilities: list of integrations (max 5)
-        - category: tool category
-        - github_url: GitHub repository URL if available
-        - documentation_url: Documentation URL if available
-        
-        Return only valid, real companies/tools. Be accurate and factual.
-        Format as JSON array.
-        """
+        return self.generate_companies_batch([(query, count)])[0]
+    
+    async def _agenerate_companies_with_llm(self, query: str, count: int) -> List[Company]:
+        """Async version of _generate_companies_with_llm."""
+        
+        return (await self.agenerate_companies_batch([(query, count)]))[0]
+    
+    def generate_companies_batch(self, items: List[Tuple[str, int]]) -> List[List[Company]]:
+        """Use a single LLM call to generate company information for several (query, count) pairs."""
+        
+        if not items:
+            return []
         
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are a knowledgeable research assistant for developer tools and companies."),
-                HumanMessage(content=prompt)
-            ])
-            
-            # Parse the response and create Company objects
-            import json
-            try:
-                companies_data = json.loads(response.content)
-                if isinstance(companies_data, list):
-                    return [Company(**company_data) for company_data in companies_data]
-                else:
-                    return []
-            except json.JSONDecodeError:
-                logger.error("Failed to parse LLM response as JSON")
-                return []
+            # Exact-match cache only: prompts that differ just in a count or a company name look
+            # near-identical to an embedding model but need different answers
+            response = cached_invoke(
+                self._companies_llm, self._companies_batch_messages(items), validate=_CompanyBatch.model_validate_json
+            )
+            return self._parse_companies_batch(response.content, len(items))
                 
         except Exception as e:
             logger.error(f"Error generating companies with LLM: {str(e)}")
+            return [[] for _ in items]
+    
+    async def agenerate_companies_batch(self, items: List[Tuple[str, int]]) -> List[List[Company]]:
+        """Async version of generate_companies_batch."""
+        
+        if not items:
             return []
+        
+        try:
+            response = await acached_invoke(
+                self._companies_llm, self._companies_batch_messages(items), validate=_CompanyBatch.model_validate_json
+            )
+            return self._parse_companies_batch(response.content, len(items))
+                
+        except Exception as e:
+            logger.error(f"Error generating companies with LLM: {str(e)}")
+            return [[] for _ in items]
+    
+    def _companies_batch_messages(self, items: List[Tuple[str, int]]) -> List[BaseMessage]:
+        """Build the batched company-generation prompt, one numbered section per query."""
+        
+        prompt = "\n\n".join(
+            f"### Query {i}: \"{query}\"\nGenerate {count} companies/tools."
+            for i, (query, count) in enumerate(items, 1)
+        )
+        
+        return [
+            SystemMessage(content=RESEARCH_SYSTEM_PROMPT + COMPANY_GENERATION_INSTRUCTIONS),
+            HumanMessage(content=prompt)
+        ]
+    
+    def _parse_companies_batch(self, content: str, count: int) -> List[List[Company]]:
+        """Parse a {"results": [[...], ...]} response into one list of companies per query."""
+        
+        empty = [[] for _ in range(count)]
+        
+        try:
+            results = _CompanyBatch.model_validate_json(content).results
+        except ValidationError as e:
+            logger.error(f"Failed to parse LLM response: {str(e)}")
+            return empty
+        
+        return results[:count] + empty[len(results):]
     
     def get_company_details(self, company_name: str, website: str = None) -> Optional[Company]:
         """Get detailed information about a specific company."""
@@ -130,35 +246,15 @@ class ResearchAgent:
                 return self._process_scraped_data(scraped_data)
         
         # Fallback to LLM-based research
-        prompt = f"""
-        Research the company/tool: {company_name}
-        
-        Provide detailed information in JSON format with these fields:
-        - name
-        - website
-        - description
-        - pricing_model
-        - is_open_source
-        - tech_stack
-        - language_support
-        - api_available
-        - integration_capabilities
-        - category
-        - github_url
-        - documentation_url
-        
-        Be accurate and factual. If information is not available, use null.
-        """
+        prompt = f"Company/tool: {company_name}"
         
         try:
-            response = self.llm.invoke([
-                SystemMessage(content="You are a knowledgeable research assistant for developer tools and companies."),
+            response = cached_invoke(self._company_llm, [
+                SystemMessage(content=RESEARCH_SYSTEM_PROMPT + COMPANY_DETAILS_INSTRUCTIONS),
                 HumanMessage(content=prompt)
-            ])
+            ], validate=Company.model_validate_json)
             
-            import json
-            company_data = json.loads(response.content)
-            return Company(**company_data)
+            return Company.model_validate_json(response.content)
             
         except Exception as e:
             logger.error(f"Error getting company details: {str(e)}")
@@ -1,4 +1,4 @@
-from .company import Company
+from .company import Company, COMPANY_JSON_SCHEMA
 from .research_result import ResearchResult
 
-__all__ = ["Company", "ResearchResult"]
+__all__ = ["Company", "COMPANY_JSON_SCHEMA", "ResearchResult"]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 
 
@@ -18,8 +18,10 @@ class Company(BaseModel):
     github_url: Optional[str] = Field(None, description="GitHub repository URL")
     documentation_url: Optional[str] = Field(None, description="Documentation URL")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra='ignore',
+        json_schema_extra={
             "example": {
                 "name": "MongoDB",
                 "website": "https://mongodb.com",
@@ -35,3 +37,8 @@ class Company(BaseModel):
                 "documentation_url": "https://docs.mongodb.com"
             }
         }
+    )
+
+
+# Built once at import rather than re-walking the model for every prompt
+COMPANY_JSON_SCHEMA = Company.model_json_schema()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
 from .company import Company
 
@@ -12,8 +12,10 @@ class ResearchResult(BaseModel):
     total_results: int = Field(0, description="Total number of results found")
     search_time: Optional[float] = Field(None, description="Time taken to complete the search")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        extra='ignore',
+        json_schema_extra={
             "example": {
                 "query": "NoSQL databases",
                 "companies": [
@@ -30,3 +32,4 @@ class ResearchResult(BaseModel):
                 "search_time": 2.5
             }
         }
+    )
@@ -3,6 +3,24 @@ from langchain.tools import BaseTool
 from src.models.company import Company
 
 
+# (predicate, template) rules applied in order to every company. Predicates get the
+# company and its lower-cased integrations as a frozenset for O(1) membership checks.
+RULES = [
+    (lambda company, integrations: company.is_open_source,
+     "{name} is open source. This can offer flexibility and community support."),
+    (lambda company, integrations: not company.is_open_source,
+     "{name} is not open source. Consider open source alternatives for community-driven improvements."),
+    (lambda company, integrations: company.pricing_model == "freemium",
+     "{name} offers a freemium model. You can start for free and upgrade as needed."),
+    (lambda company, integrations: company.pricing_model == "paid",
+     "{name} requires a subscription. Consider costs against your budget."),
+    (lambda company, integrations: "aws" in integrations,
+     "{name} integrates with AWS, providing scalable cloud solutions."),
+    (lambda company, integrations: bool(company.tech_stack),
+     "{name} uses technologies like {tech_stack}."),
+]
+
+
 class CompanyAnalyzer(BaseTool):
     """Tool to analyze company data and provide recommendations."""
 
@@ -12,23 +30,22 @@ class CompanyAnalyzer(BaseTool):
     def analyze(self, companies: List[Company]) -> Dict[str, Any]:
         """Analyze a list of companies and return insights and recommendations."""
         
-        analysis = []
-        for company in companies:
-            if company.is_open_source:
-                analysis.append(f"{company.name} is open source. This can offer flexibility and community support.")
-            else:
-                analysis.append(f"{company.name} is not open source. Consider open source alternatives for community-driven improvements.")
-            
-            if company.pricing_model == "freemium":
-                analysis.append(f"{company.name} offers a freemium model. You can start for free and upgrade as needed.")
-            elif company.pricing_model == "paid":
-                analysis.append(f"{company.name} requires a subscription. Consider costs against your budget.")
-                
-            if "AWS" in company.integration_capabilities:
-                analysis.append(f"{company.name} integrates with AWS, providing scalable cloud solutions.")
-
-            if company.tech_stack:
-                analysis.append(f"{company.name} uses technologies like {', '.join(company.tech_stack[:3])}.")
+        # Per-company values computed once, before any rule runs
+        prepared = [
+            (
+                company,
+                frozenset(map(str.lower, company.integration_capabilities)),
+                {'name': company.name, 'tech_stack': ', '.join(company.tech_stack[:3])}
+            )
+            for company in companies
+        ]
+        
+        analysis = [
+            template.format_map(fields)
+            for company, integrations, fields in prepared
+            for predicate, template in RULES
+            if predicate(company, integrations)
+        ]
 
         return {
             "analysis": analysis,
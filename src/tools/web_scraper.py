@@ -1,13 +1,119 @@
 import os
 import asyncio
-from typing import List, Optional, Dict, Any
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
+import httpx
+import orjson
+import requests
 from firecrawl import FirecrawlApp
+from requests.adapters import HTTPAdapter
 from langchain.tools import BaseTool
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 import logging
 
+from src.utils.config import Config
+from src.utils.scrape_cache import get_cached_scrape, scrape_cache_key, store_scrape
+
 logger = logging.getLogger(__name__)
 
+# FireCrawl scrape parameters, built once; their hashes key the scrape cache so a schema change invalidates it
+_COMPANY_PARAMS = {
+    'formats': ['markdown', 'extract'],
+    'extract': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'company_name': {'type': 'string'},
+                'description': {'type': 'string'},
+                'pricing_model': {'type': 'string'},
+                'is_open_source': {'type': 'boolean'},
+                'tech_stack': {'type': 'array', 'items': {'type': 'string'}},
+                'language_support': {'type': 'array', 'items': {'type': 'string'}},
+                'api_available': {'type': 'boolean'},
+                'integrations': {'type': 'array', 'items': {'type': 'string'}},
+                'github_url': {'type': 'string'},
+                'documentation_url': {'type': 'string'}
+            }
+        }
+    }
+}
+
+_GITHUB_PARAMS = {
+    'formats': ['markdown', 'extract'],
+    'extract': {
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'repository_name': {'type': 'string'},
+                'description': {'type': 'string'},
+                'language': {'type': 'string'},
+                'languages': {'type': 'array', 'items': {'type': 'string'}},
+                'stars': {'type': 'integer'},
+                'forks': {'type': 'integer'},
+                'license': {'type': 'string'},
+                'topics': {'type': 'array', 'items': {'type': 'string'}},
+                'website': {'type': 'string'},
+                'documentation': {'type': 'string'}
+            }
+        }
+    }
+}
+
+_COMPANY_SCHEMA_HASH = hashlib.blake2b(orjson.dumps(_COMPANY_PARAMS, option=orjson.OPT_SORT_KEYS)).hexdigest()
+_GITHUB_SCHEMA_HASH = hashlib.blake2b(orjson.dumps(_GITHUB_PARAMS, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+# Polling interval bounds (seconds) while waiting for a batch scrape job
+BATCH_POLL_INITIAL_DELAY = 1.0
+BATCH_POLL_MAX_DELAY = 8.0
+
+
+class _PooledFirecrawlApp(FirecrawlApp):
+    """FirecrawlApp whose scrape and search calls reuse one keep-alive connection pool.
+    
+    The SDK sends these through a bare requests.post, opening a new TLS connection
+    per call; this instance sends them to the same v1 endpoints through its own
+    session instead, taking and returning the dicts the tool works with.
+    """
+    
+    def __init__(self, api_key: str, timeout: float):
+        super().__init__(api_key=api_key)
+        self._timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=32)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+    
+    def scrape_url(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        body = self._post("/v1/scrape", {'url': url, **(params or {})})
+        return {'success': True, **body.get('data', {})} if body.get('success') else body
+    
+    def search(self, query: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        return self._post("/v1/search", {'query': query, **(params or {})})
+    
+    def close(self) -> None:
+        self._session.close()
+    
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._session.post(
+            f"{self.api_url}{path}",
+            headers={'Authorization': f"Bearer {self.api_key}"},
+            json=payload,
+            timeout=self._timeout
+        )
+        return response.json()
+
+
+def _async_http_client(timeout: float) -> httpx.AsyncClient:
+    """Create a keep-alive HTTP/2 client for FireCrawl calls; callers close it with async with."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+    )
+
 
 class WebScraperTool(BaseTool):
     """Tool for web scraping using FireCrawl API."""
@@ -16,148 +122,302 @@ class WebScraperTool(BaseTool):
     description: str = "Scrapes web pages to extract information about companies and developer tools"
     
     firecrawl_app: FirecrawlApp = Field(default=None)
+    config: Config = Field(default=None)
+    
+    # Bounded pool for the blocking SDK calls made from async code
+    _executor: ThreadPoolExecutor = PrivateAttr(default=None)
+    _executor_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
     
-    def __init__(self, **kwargs):
+    def __init__(self, config: Optional[Config] = None, **kwargs):
         super().__init__(**kwargs)
+        self.config = config or Config.from_env()
         api_key = os.getenv("FIRECRAWL_API_KEY")
         if not api_key:
             raise ValueError("FIRECRAWL_API_KEY environment variable is required")
-        self.firecrawl_app = FirecrawlApp(api_key=api_key)
+        self.firecrawl_app = _PooledFirecrawlApp(api_key=api_key, timeout=self.config.scraping_timeout)
     
-    def _run(self, url: str, **kwargs) -> Dict[str, Any]:
-        """Scrape a single URL and return structured data."""
+    def _run(self, url: str, force_rescrape: bool = False, **kwargs) -> Dict[str, Any]:
+        """Scrape a single URL and return structured data, reusing a cached scrape unless force_rescrape is set."""
+        cache_key = scrape_cache_key(url, _COMPANY_SCHEMA_HASH)
+        if not force_rescrape:
+            cached = get_cached_scrape(cache_key, self.config.scrape_cache_ttl)
+            if cached is not None:
+                return cached
+        
         try:
             # Scrape the URL
             scrape_result = self.firecrawl_app.scrape_url(
                 url=url,
-                params={
-                    'formats': ['markdown', 'extract'],
-                    'extract': {
-                        'schema': {
-                            'type': 'object',
-                            'properties': {
-                                'company_name': {'type': 'string'},
-                                'description': {'type': 'string'},
-                                'pricing_model': {'type': 'string'},
-                                'is_open_source': {'type': 'boolean'},
-                                'tech_stack': {'type': 'array', 'items': {'type': 'string'}},
-                                'language_support': {'type': 'array', 'items': {'type': 'string'}},
-                                'api_available': {'type': 'boolean'},
-                                'integrations': {'type': 'array', 'items': {'type': 'string'}},
-                                'github_url': {'type': 'string'},
-                                'documentation_url': {'type': 'string'}
-                            }
-                        }
-                    }
-                }
+                params=_COMPANY_PARAMS
             )
             
-            if scrape_result.get('success'):
-                return {
-                    'success': True,
-                    'url': url,
-                    'markdown': scrape_result.get('markdown', ''),
-                    'extracted_data': scrape_result.get('extract', {}),
-                    'metadata': scrape_result.get('metadata', {})
-                }
-            else:
-                logger.error(f"Failed to scrape {url}: {scrape_result.get('error', 'Unknown error')}")
-                return {
-                    'success': False,
-                    'url': url,
-                    'error': scrape_result.get('error', 'Unknown error')
-                }
+            return self._company_scrape_result(url, scrape_result, cache_key)
                 
         except Exception as e:
-            logger.error(f"Exception while scraping {url}: {str(e)}")
+            logger.error("Exception while scraping %s: %s", url, e)
             return {
                 'success': False,
                 'url': url,
                 'error': str(e)
             }
     
-    async def _arun(self, url: str, **kwargs) -> Dict[str, Any]:
-        """Async version of _run."""
-        return await asyncio.get_event_loop().run_in_executor(
-            None, self._run, url
-        )
+    async def _arun(
+        self, url: str, force_rescrape: bool = False, client: Optional[httpx.AsyncClient] = None, **kwargs
+    ) -> Dict[str, Any]:
+        """Async version of _run, calling the FireCrawl scrape endpoint directly on the event loop.
+        
+        Pass client to reuse a caller's connection pool; otherwise one is opened for this call.
+        """
+        cache_key = scrape_cache_key(url, _COMPANY_SCHEMA_HASH)
+        if not force_rescrape:
+            cached = get_cached_scrape(cache_key, self.config.scrape_cache_ttl)
+            if cached is not None:
+                return cached
+        
+        if client is None:
+            async with _async_http_client(self.config.scraping_timeout) as client:
+                # The cache was already checked above
+                return await self._arun(url, force_rescrape=True, client=client)
+        
+        try:
+            response = await client.post(
+                f"{self.firecrawl_app.api_url}/v1/scrape",
+                headers={'Authorization': f"Bearer {self.firecrawl_app.api_key}"},
+                json={'url': url, **_COMPANY_PARAMS}
+            )
+            body = response.json()
+            scrape_result = {'success': True, **body.get('data', {})} if body.get('success') else body
+            return self._company_scrape_result(url, scrape_result, cache_key)
+            
+        except Exception as e:
+            logger.error("Exception while scraping %s: %s", url, e)
+            return {
+                'success': False,
+                'url': url,
+                'error': str(e)
+            }
+    
+    def _company_scrape_result(self, url: str, scrape_result: Dict[str, Any], cache_key: str) -> Dict[str, Any]:
+        """Shape a FireCrawl scrape response into the result dict, caching it if it succeeded."""
+        if scrape_result.get('success'):
+            result = {
+                'success': True,
+                'url': url,
+                'markdown': scrape_result.get('markdown', ''),
+                'extracted_data': scrape_result.get('extract', {}),
+                'metadata': scrape_result.get('metadata', {})
+            }
+            store_scrape(cache_key, result)
+            return result
+        else:
+            logger.error("Failed to scrape %s: %s", url, scrape_result.get('error', 'Unknown error'))
+            return {
+                'success': False,
+                'url': url,
+                'error': scrape_result.get('error', 'Unknown error')
+            }
     
     def search_and_scrape(self, query: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """Search for URLs related to a query and scrape them."""
+        return asyncio.run(self.asearch_and_scrape(query, max_results))
+    
+    async def asearch_and_scrape(
+        self, query: str, max_results: int = 10, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Dict[str, Any]]:
+        """Async version of search_and_scrape that scrapes all result URLs in one FireCrawl batch job.
+        
+        Pass semaphore to share one concurrency bound between several concurrent searches.
+        """
         try:
-            # Use FireCrawl's search functionality
-            search_result = self.firecrawl_app.search(
-                query=query,
-                params={
-                    'limit': max_results,
-                    'search_depth': 'basic',
-                    'include_domains': [
-                        'github.com',
-                        'docs.mongodb.com',
-                        'www.postgresql.org',
-                        'redis.io',
-                        'cassandra.apache.org',
-                        'www.docker.com',
-                        'kubernetes.io',
-                        'aws.amazon.com',
-                        'cloud.google.com',
-                        'azure.microsoft.com'
-                    ]
-                }
+            urls = await asyncio.get_running_loop().run_in_executor(
+                self._blocking_executor(), self._search_urls, query, max_results
             )
-            
-            if not search_result.get('success'):
-                logger.error(f"Search failed for query '{query}': {search_result.get('error', 'Unknown error')}")
-                return []
-            
-            results = []
-            for result in search_result.get('data', []):
-                url = result.get('url', '')
-                if url:
-                    scraped_data = self._run(url)
-                    results.append(scraped_data)
-            
-            return results
+            async with _async_http_client(self.config.scraping_timeout) as client:
+                return await self._abatch_scrape(urls, client, semaphore)
             
         except Exception as e:
-            logger.error(f"Exception during search and scrape for query '{query}': {str(e)}")
+            logger.error("Exception during search and scrape for query '%s': %s", query, e)
             return []
     
-    def scrape_github_repo(self, repo_url: str) -> Dict[str, Any]:
+    async def stream_search_and_scrape(self, query: str, max_results: int = 10) -> AsyncIterator[Dict[str, Any]]:
+        """Search for URLs related to a query and yield each scrape result as soon as it completes."""
+        try:
+            urls = await asyncio.get_running_loop().run_in_executor(
+                self._blocking_executor(), self._search_urls, query, max_results
+            )
+        except Exception as e:
+            logger.error("Exception during search and scrape for query '%s': %s", query, e)
+            return
+        
+        async with _async_http_client(self.config.scraping_timeout) as client:
+            for next_result in asyncio.as_completed(self._bounded_scrapes(urls, client)):
+                yield await next_result
+    
+    async def _abatch_scrape(
+        self, urls: List[str], client: httpx.AsyncClient, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Dict[str, Any]]:
+        """Scrape URLs with a single batch job, falling back to per-URL scrapes for any the batch does not return.
+        
+        The batch job takes one slot of the semaphore, like a single scrape.
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_scraping_concurrent)
+        
+        results = {}
+        pending = {}
+        for url in urls:
+            cache_key = scrape_cache_key(url, _COMPANY_SCHEMA_HASH)
+            cached = get_cached_scrape(cache_key, self.config.scrape_cache_ttl)
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending[url.rstrip('/')] = (url, cache_key)
+        
+        if len(pending) > 1:
+            try:
+                async with semaphore:
+                    batch = await self._abatch_scrape_job([url for url, _ in pending.values()], client)
+                for data in batch:
+                    source_url = data.get('metadata', {}).get('sourceURL', '').rstrip('/')
+                    if source_url in pending:
+                        url, cache_key = pending[source_url]
+                        results[url] = self._company_scrape_result(url, {'success': True, **data}, cache_key)
+            except Exception as e:
+                logger.warning("Batch scrape failed, falling back to per-URL scrapes: %s", e)
+        
+        missing = [url for url in urls if url not in results]
+        for url, result in zip(missing, await asyncio.gather(*self._bounded_scrapes(missing, client, semaphore))):
+            results[url] = result
+        
+        return [results[url] for url in urls]
+    
+    async def _abatch_scrape_job(self, urls: List[str], client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+        """Start a FireCrawl batch scrape and poll it with exponential backoff until it completes.
+        
+        A job still running after batch_scrape_timeout is cancelled and the pages it
+        has finished so far are returned.
+        """
+        headers = {'Authorization': f"Bearer {self.firecrawl_app.api_key}"}
+        
+        response = await client.post(
+            f"{self.firecrawl_app.api_url}/v1/batch/scrape",
+            headers=headers,
+            json={'urls': urls, **_COMPANY_PARAMS}
+        )
+        job = response.json()
+        if not job.get('success'):
+            raise RuntimeError(job.get('error', 'Unknown error'))
+        
+        job_url = f"{self.firecrawl_app.api_url}/v1/batch/scrape/{job['id']}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.batch_scrape_timeout
+        delay = BATCH_POLL_INITIAL_DELAY
+        while True:
+            await asyncio.sleep(delay)
+            status = (await client.get(job_url, headers=headers)).json()
+            if status.get('status') == 'completed':
+                return status.get('data', [])
+            if status.get('status') == 'failed' or not status.get('success', True):
+                raise RuntimeError(status.get('error', 'Batch scrape failed'))
+            if loop.time() + delay > deadline:
+                break
+            delay = min(delay * 2, BATCH_POLL_MAX_DELAY)
+        
+        # Stop the job so it does not keep scraping, and billing, the URLs about to be scraped individually
+        logger.warning("Batch scrape %s did not complete within %ss, cancelling it", job['id'], self.config.batch_scrape_timeout)
+        try:
+            await client.delete(job_url, headers=headers)
+        except Exception as e:
+            logger.warning("Failed to cancel batch scrape %s: %s", job['id'], e)
+        return status.get('data', [])
+    
+    def _blocking_executor(self) -> ThreadPoolExecutor:
+        """Return the thread pool for blocking SDK calls, creating it on first use."""
+        # Workflow methods run in parallel threads, each with its own event loop, and may all get here at once
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config.max_scraping_concurrent,
+                    thread_name_prefix="web_scraper"
+                )
+            return self._executor
+    
+    def close(self) -> None:
+        """Shut down the thread pool and close the FireCrawl connection pool."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        if isinstance(self.firecrawl_app, _PooledFirecrawlApp):
+            self.firecrawl_app.close()
+    
+    def _bounded_scrapes(
+        self, urls: List[str], client: httpx.AsyncClient, semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[Awaitable[Dict[str, Any]]]:
+        """Build scrape coroutines for the URLs that run at most max_scraping_concurrent at a time and never raise."""
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_scraping_concurrent)
+        
+        async def bounded_scrape(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self._arun(url, client=client)
+                except Exception as e:
+                    return {'success': False, 'url': url, 'error': str(e)}
+        
+        return [bounded_scrape(url) for url in urls]
+    
+    def _search_urls(self, query: str, max_results: int) -> List[str]:
+        """Search for URLs related to a query."""
+        # Use FireCrawl's search functionality
+        search_result = self.firecrawl_app.search(
+            query=query,
+            params={
+                'limit': max_results,
+                'search_depth': 'basic',
+                'include_domains': list(self.config.include_domains)
+            }
+        )
+        
+        if not search_result.get('success'):
+            logger.error("Search failed for query '%s': %s", query, search_result.get('error', 'Unknown error'))
+            return []
+        
+        return [
+            result['url'] for result in search_result.get('data', [])
+            if result.get('url') and (not self.config.filter_include_domains or self._is_allowed_domain(result['url']))
+        ]
+    
+    def _is_allowed_domain(self, url: str) -> bool:
+        """Check whether the URL's host, or a parent domain of it, is in the configured allow-list."""
+        labels = (urlparse(url).hostname or '').split('.')
+        allowed = self.config.include_domains_set
+        return any('.'.join(labels[i:]) in allowed for i in range(len(labels) - 1))
+    
+    def scrape_github_repo(self, repo_url: str, force_rescrape: bool = False) -> Dict[str, Any]:
         """Specifically scrape GitHub repository for developer tool information."""
+        cache_key = scrape_cache_key(repo_url, _GITHUB_SCHEMA_HASH)
+        if not force_rescrape:
+            cached = get_cached_scrape(cache_key, self.config.scrape_cache_ttl)
+            if cached is not None:
+                return cached
+        
         try:
             scrape_result = self.firecrawl_app.scrape_url(
                 url=repo_url,
-                params={
-                    'formats': ['markdown', 'extract'],
-                    'extract': {
-                        'schema': {
-                            'type': 'object',
-                            'properties': {
-                                'repository_name': {'type': 'string'},
-                                'description': {'type': 'string'},
-                                'language': {'type': 'string'},
-                                'languages': {'type': 'array', 'items': {'type': 'string'}},
-                                'stars': {'type': 'integer'},
-                                'forks': {'type': 'integer'},
-                                'license': {'type': 'string'},
-                                'topics': {'type': 'array', 'items': {'type': 'string'}},
-                                'website': {'type': 'string'},
-                                'documentation': {'type': 'string'}
-                            }
-                        }
-                    }
-                }
+                params=_GITHUB_PARAMS
             )
             
             if scrape_result.get('success'):
-                return {
+                result = {
                     'success': True,
                     'url': repo_url,
                     'extracted_data': scrape_result.get('extract', {}),
                     'markdown': scrape_result.get('markdown', ''),
                     'metadata': scrape_result.get('metadata', {})
                 }
+                store_scrape(cache_key, result)
+                return result
             else:
                 return {
                     'success': False,
@@ -166,7 +426,7 @@ class WebScraperTool(BaseTool):
                 }
                 
         except Exception as e:
-            logger.error(f"Exception while scraping GitHub repo {repo_url}: {str(e)}")
+            logger.error("Exception while scraping GitHub repo %s: %s", repo_url, e)
             return {
                 'success': False,
                 'url': repo_url,
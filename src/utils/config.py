@@ -1,53 +1,64 @@
 import os
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Tuple
 
+DEFAULT_INCLUDE_DOMAINS = (
+    "github.com",
+    "docs.mongodb.com",
+    "www.postgresql.org",
+    "redis.io",
+    "cassandra.apache.org",
+    "www.docker.com",
+    "kubernetes.io",
+    "aws.amazon.com",
+    "cloud.google.com",
+    "azure.microsoft.com",
+    "www.elastic.co",
+    "www.splunk.com",
+    "grafana.com",
+    "prometheus.io"
+)
 
-class Config(BaseModel):
+
+@dataclass(slots=True, frozen=True)
+class Config:
     """Configuration settings for the research agent."""
     
     # API Keys
-    openai_api_key: str = Field(..., description="OpenAI API key")
-    firecrawl_api_key: str = Field(..., description="FireCrawl API key")
+    openai_api_key: str
+    firecrawl_api_key: str
     
     # LLM Settings
-    llm_model: str = Field(default="gpt-4o-mini", description="LLM model to use")
-    llm_temperature: float = Field(default=0.1, description="LLM temperature")
-    max_tokens: int = Field(default=2000, description="Maximum tokens for LLM responses")
+    llm_model: str = "gpt-4o-mini"
+    llm_temperature: float = 0.1
+    max_tokens: int = 2000  # Maximum tokens for LLM responses
     
     # Research Settings
-    max_search_results: int = Field(default=10, description="Maximum number of search results")
-    max_scraping_concurrent: int = Field(default=5, description="Maximum concurrent scraping operations")
+    max_search_results: int = 10
+    max_scraping_concurrent: int = 5  # Maximum concurrent scraping operations
     
     # Scraping Settings
-    scraping_timeout: int = Field(default=30, description="Scraping timeout in seconds")
-    include_domains: List[str] = Field(
-        default_factory=lambda: [
-            "github.com",
-            "docs.mongodb.com",
-            "www.postgresql.org",
-            "redis.io",
-            "cassandra.apache.org",
-            "www.docker.com",
-            "kubernetes.io",
-            "aws.amazon.com",
-            "cloud.google.com",
-            "azure.microsoft.com",
-            "www.elastic.co",
-            "www.splunk.com",
-            "grafana.com",
-            "prometheus.io"
-        ],
-        description="Domains to include in search results"
-    )
+    scraping_timeout: int = 30  # Seconds
+    batch_scrape_timeout: int = 120  # Seconds to wait for a whole batch scrape job
+    scrape_cache_ttl: int = 86400  # Seconds to reuse a cached scrape result
+    include_domains: Tuple[str, ...] = DEFAULT_INCLUDE_DOMAINS  # Domains to include in search results
+    filter_include_domains: bool = False  # Also drop search results outside include_domains
     
     # Logging Settings
-    log_level: str = Field(default="INFO", description="Logging level")
-    log_file: str = Field(default="research_agent.log", description="Log file name")
+    log_level: str = "INFO"
+    log_file: str = "research_agent.log"
+    
+    # include_domains as a set, for allow-list lookups; derived in __post_init__
+    include_domains_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'include_domains_set', frozenset(self.include_domains))
     
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> 'Config':
-        """Create configuration from environment variables."""
+        """Create configuration from environment variables, once per process (see invalidate)."""
         return cls(
             openai_api_key=os.getenv("OPENAI_API_KEY", ""),
             firecrawl_api_key=os.getenv("FIRECRAWL_API_KEY", ""),
@@ -57,10 +68,22 @@ class Config(BaseModel):
             max_search_results=int(os.getenv("MAX_SEARCH_RESULTS", "10")),
             max_scraping_concurrent=int(os.getenv("MAX_SCRAPING_CONCURRENT", "5")),
             scraping_timeout=int(os.getenv("SCRAPING_TIMEOUT", "30")),
+            batch_scrape_timeout=int(os.getenv("BATCH_SCRAPE_TIMEOUT", "120")),
+            scrape_cache_ttl=int(os.getenv("SCRAPE_CACHE_TTL", "86400")),
+            filter_include_domains=os.getenv("FILTER_INCLUDE_DOMAINS", "false").lower() == "true",
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             log_file=os.getenv("LOG_FILE", "research_agent.log")
         )
     
+    @classmethod
+    def invalidate(cls) -> None:
+        """Forget the cached from_env() configuration so the next call re-reads the environment."""
+        cls.from_env.cache_clear()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the settings as a plain dict, e.g. for JSON serialization."""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+    
     def validate_keys(self) -> List[str]:
         """Validate that required API keys are present."""
         missing_keys = []
@@ -0,0 +1,243 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+from langchain.schema import AIMessage, BaseMessage, HumanMessage
+from openai import RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+from src.utils import similarity_store
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path("cache") / "llm_cache.sqlite3"
+CACHE_TABLE = "llm_responses"
+SIMILARITY_THRESHOLD = 0.95
+
+# Back off on 429s instead of failing (and letting callers retry in a storm)
+_retry_on_rate_limit = retry(
+    retry=retry_if_exception_type(RateLimitError),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    stop=stop_after_attempt(6),
+    reraise=True
+)
+
+# Calls currently in flight, keyed like the cache, so concurrent identical prompts share one API call
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def cached_invoke(
+    llm, messages: Sequence[BaseMessage], ttl: int = 3600, embeddings=None,
+    validate: Optional[Callable[[str], Any]] = None
+):
+    """Invoke the LLM, serving identical (or, with embeddings, near-identical) prompts from cache.
+
+    Lookups go through two tiers: an exact match on the SHA256 of the message
+    contents, then - if an embeddings model is given - a cosine-similarity
+    search over earlier prompts that share the same instruction prefix.
+
+    If validate is given, it is called with the response text before storing it;
+    a response it raises on is returned but not cached, so the next call retries.
+    """
+
+    key, scope = _cache_keys(messages)
+    now = int(time.time())
+
+    hit = _exact_lookup(key, now - ttl)
+    if hit is not None:
+        return AIMessage(content=hit)
+
+    embedding = _embed(embeddings, messages) if embeddings is not None else None
+    if embedding:
+        hit = _semantic_lookup(scope, embedding, now - ttl)
+        if hit is not None:
+            return AIMessage(content=hit)
+
+    def invoke():
+        response = _invoke(llm, messages)
+        if _is_valid(response.content, validate):
+            _store(key, scope, response.content, now, embedding, ttl)
+        return response
+
+    return _single_flight(key, invoke)
+
+
+async def acached_invoke(
+    llm, messages: Sequence[BaseMessage], ttl: int = 3600, embeddings=None,
+    validate: Optional[Callable[[str], Any]] = None
+):
+    """Async version of cached_invoke."""
+
+    key, scope = _cache_keys(messages)
+    now = int(time.time())
+
+    hit = _exact_lookup(key, now - ttl)
+    if hit is not None:
+        return AIMessage(content=hit)
+
+    embedding = await _aembed(embeddings, messages) if embeddings is not None else None
+    if embedding:
+        hit = _semantic_lookup(scope, embedding, now - ttl)
+        if hit is not None:
+            return AIMessage(content=hit)
+
+    async def invoke():
+        response = await _ainvoke(llm, messages)
+        if _is_valid(response.content, validate):
+            _store(key, scope, response.content, now, embedding, ttl)
+        return response
+
+    return await _asingle_flight(key, invoke)
+
+
+def cached_stream(llm, messages: Sequence[BaseMessage], ttl: int = 3600, embeddings=None) -> Iterator[str]:
+    """Stream the LLM response as text chunks; a cached response is yielded as a single chunk."""
+
+    key, scope = _cache_keys(messages)
+    now = int(time.time())
+
+    hit = _exact_lookup(key, now - ttl)
+    if hit is not None:
+        yield hit
+        return
+
+    embedding = _embed(embeddings, messages) if embeddings is not None else None
+    if embedding:
+        hit = _semantic_lookup(scope, embedding, now - ttl)
+        if hit is not None:
+            yield hit
+            return
+
+    chunks = []
+    for chunk in llm.stream(messages):
+        chunks.append(chunk.content)
+        yield chunk.content
+    _store(key, scope, "".join(chunks), now, embedding, ttl)
+
+
+def _is_valid(content: Any, validate: Optional[Callable[[str], Any]]) -> bool:
+    """Whether a response can be cached: text that validate, if given, accepts."""
+    if not isinstance(content, str):
+        return False
+    if validate is None:
+        return True
+    try:
+        validate(content)
+    except Exception as e:
+        logger.warning(f"Not caching LLM response that failed validation: {str(e)}")
+        return False
+    return True
+
+
+@_retry_on_rate_limit
+def _invoke(llm, messages: Sequence[BaseMessage]):
+    return llm.invoke(messages)
+
+
+@_retry_on_rate_limit
+async def _ainvoke(llm, messages: Sequence[BaseMessage]):
+    return await llm.ainvoke(messages)
+
+
+def _single_flight(key: str, call: Callable[[], Any]) -> Any:
+    """Run call() once for concurrent requests with the same key; the others wait for its result."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        return future.result()
+
+    try:
+        result = call()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+async def _asingle_flight(key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+    """Async version of _single_flight; shares in-flight calls with sync callers and other event loops."""
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+
+    if not leader:
+        return await asyncio.wrap_future(future)
+
+    try:
+        result = await call()
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def _cache_keys(messages: Sequence[BaseMessage]) -> Tuple[str, str]:
+    """Return the exact-match key for the messages and the scope key of their instruction prefix."""
+    contents = [message.content for message in messages]
+    return _digest(contents), _digest(contents[:-1])
+
+
+def _digest(contents: List[str]) -> str:
+    return hashlib.sha256(orjson.dumps(contents)).hexdigest()
+
+
+def _exact_lookup(key: str, min_ts: int) -> Optional[str]:
+    return similarity_store.get_exact(CACHE_PATH, CACHE_TABLE, key, min_ts)
+
+
+def _last_human_text(messages: Sequence[BaseMessage]) -> Optional[str]:
+    return next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+
+
+def _embed(embeddings, messages: Sequence[BaseMessage]) -> Optional[List[float]]:
+    """Embed the last human message, returning None if that is not possible."""
+    text = _last_human_text(messages)
+    if not text:
+        return None
+    try:
+        return embeddings.embed_query(text)
+    except Exception as e:
+        logger.warning(f"Failed to embed prompt for semantic cache lookup: {str(e)}")
+        return None
+
+
+async def _aembed(embeddings, messages: Sequence[BaseMessage]) -> Optional[List[float]]:
+    """Async version of _embed."""
+    text = _last_human_text(messages)
+    if not text:
+        return None
+    try:
+        return await embeddings.aembed_query(text)
+    except Exception as e:
+        logger.warning(f"Failed to embed prompt for semantic cache lookup: {str(e)}")
+        return None
+
+
+def _semantic_lookup(scope: str, embedding: List[float], min_ts: int) -> Optional[str]:
+    """Return the cached response whose prompt is most similar to the embedding, if above threshold."""
+    return similarity_store.get_similar(CACHE_PATH, CACHE_TABLE, scope, embedding, min_ts, SIMILARITY_THRESHOLD)
+
+
+def _store(key: str, scope: str, resp: str, ts: int, embedding: Optional[List[float]], ttl: int) -> None:
+    similarity_store.put(CACHE_PATH, CACHE_TABLE, key, scope, resp, ts, embedding, ttl)
@@ -0,0 +1,44 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+
+@lru_cache(maxsize=1)
+def _api_key() -> Optional[str]:
+    """Read the OpenAI API key once, on first use rather than at import (entry points load .env after importing)."""
+    return os.getenv("OPENAI_API_KEY")
+
+
+@lru_cache(maxsize=1)
+def _http_client() -> httpx.Client:
+    """Shared keep-alive HTTP/2 connection pool for all OpenAI calls."""
+    return httpx.Client(
+        http2=True,
+        timeout=30.0,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    )
+
+
+@lru_cache(maxsize=4)
+def get_llm(model: str, temperature: float, max_tokens: Optional[int] = None) -> ChatOpenAI:
+    """Return the shared chat client for a model/temperature/output-cap combination."""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        openai_api_key=_api_key(),
+        http_client=_http_client()
+    )
+
+
+@lru_cache(maxsize=4)
+def get_embeddings(model: str) -> OpenAIEmbeddings:
+    """Return the shared embeddings client for a model."""
+    return OpenAIEmbeddings(
+        model=model,
+        openai_api_key=_api_key(),
+        http_client=_http_client()
+    )
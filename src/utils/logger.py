@@ -1,11 +1,21 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
+from typing import Optional
+
+# One handler for the log file, shared by every logger set up here. Records are put on a
+# queue and written by a background listener thread, so logging never blocks on file I/O.
+_SHARED_FILE_HANDLER: Optional[logging.handlers.QueueHandler] = None
 
 
 def setup_logger(name: str = "document-research-agent", level: int = logging.INFO) -> logging.Logger:
     """Set up logging configuration for the application."""
     
+    global _SHARED_FILE_HANDLER
+    
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -18,23 +28,29 @@ def setup_logger(name: str = "document-research-agent", level: int = logging.INF
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
     
-    # Create file handler
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
-    file_handler = logging.FileHandler(log_dir / "research_agent.log")
-    file_handler.setLevel(level)
-    
     # Create formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
+    # Create the file handler once; each logger's own level decides what reaches it
+    if _SHARED_FILE_HANDLER is None:
+        log_dir = Path("logs")
+        log_dir.mkdir(exist_ok=True)
+        file_handler = logging.FileHandler(log_dir / "research_agent.log")
+        file_handler.setFormatter(formatter)
+        
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        _SHARED_FILE_HANDLER = logging.handlers.QueueHandler(log_queue)
+    
     # Add formatter to handlers
     console_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
     
     # Add handlers to logger
     logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(_SHARED_FILE_HANDLER)
     
     return logger
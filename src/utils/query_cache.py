@@ -0,0 +1,73 @@
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.utils import similarity_store
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path("cache") / "query_cache.sqlite3"
+CACHE_TABLE = "query_results"
+
+
+class SemanticCache:
+    """Persistent cache of payloads keyed by query text, matching exact and near-duplicate queries.
+
+    Lookups go through two tiers: an exact match on the normalized query, then -
+    if an embeddings model is given - the most similar earlier query within the
+    same scope, if its cosine similarity reaches the threshold.
+    """
+
+    def __init__(self, embeddings=None, threshold: float = 0.95, ttl: int = 3600):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.ttl = ttl
+        # The embedding of the last query, so a lookup miss followed by store embeds only once
+        self._last_embedding: Optional[Tuple[str, List[float]]] = None
+
+    def lookup(self, query: str, scope: str = "") -> Optional[str]:
+        """Return the payload stored for the query, or for a query similar enough to it."""
+
+        min_ts = int(time.time()) - self.ttl
+        payload = similarity_store.get_exact(CACHE_PATH, CACHE_TABLE, self._key(query, scope), min_ts)
+        if payload is not None:
+            return payload
+
+        embedding = self._embed(query)
+        if not embedding:
+            return None
+        return similarity_store.get_similar(CACHE_PATH, CACHE_TABLE, scope, embedding, min_ts, self.threshold)
+
+    def store(self, query: str, payload: str, scope: str = "") -> None:
+        """Store the payload for the query."""
+
+        similarity_store.put(
+            CACHE_PATH, CACHE_TABLE, self._key(query, scope), scope, payload, int(time.time()), self._embed(query),
+            self.ttl
+        )
+
+    def _embed(self, query: str) -> Optional[List[float]]:
+        """Embed the normalized query, returning None if that is not possible."""
+        if self.embeddings is None:
+            return None
+        text = self._normalize(query)
+        # Read the shared memo once; other threads may replace it between two reads
+        last = self._last_embedding
+        if last is not None and last[0] == text:
+            return last[1]
+        try:
+            embedding = self.embeddings.embed_query(text)
+        except Exception as e:
+            logger.warning(f"Failed to embed query for semantic cache lookup: {str(e)}")
+            return None
+        self._last_embedding = (text, embedding)
+        return embedding
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _key(self, query: str, scope: str) -> str:
+        return hashlib.sha256(f"{scope}|{self._normalize(query)}".encode()).hexdigest()
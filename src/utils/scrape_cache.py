@@ -0,0 +1,49 @@
+import hashlib
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path("cache") / "scrape_cache.sqlite3"
+
+
+def scrape_cache_key(url: str, schema_hash: str) -> str:
+    """Return the cache key for a URL scraped with a given extraction schema."""
+    return hashlib.blake2b(f"{url}|{schema_hash}".encode()).hexdigest()
+
+
+def get_cached_scrape(key: str, ttl: int) -> Optional[Dict[str, Any]]:
+    """Return the stored scrape result for the key if it is younger than ttl seconds."""
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "SELECT result FROM scrape_cache WHERE key = ? AND ts >= ?", (key, int(time.time()) - ttl)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Scrape cache unavailable: {str(e)}")
+        return None
+    return orjson.loads(row[0]) if row else None
+
+
+def store_scrape(key: str, result: Dict[str, Any]) -> None:
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_cache (key, result, ts) VALUES (?, ?, ?)",
+                (key, orjson.dumps(result), int(time.time()))
+            )
+    except (sqlite3.Error, orjson.JSONEncodeError) as e:
+        logger.warning(f"Failed to store scrape result in cache: {str(e)}")
+
+
+def _connect() -> sqlite3.Connection:
+    CACHE_PATH.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(CACHE_PATH)
+    conn.execute("CREATE TABLE IF NOT EXISTS scrape_cache (key TEXT PRIMARY KEY, result BLOB, ts INT)")
+    return conn
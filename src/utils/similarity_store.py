@@ -0,0 +1,100 @@
+import logging
+import math
+import operator
+import sqlite3
+from array import array
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Rows kept per table; the oldest beyond this are dropped on each write, bounding semantic lookups
+MAX_ROWS = 2000
+
+
+# Sqlite tables shared by the LLM response cache and the query cache: text values stored
+# under an exact-match key, plus an optional unit-length embedding for near-duplicate lookups
+# in a scope, so similarity is a plain dot product
+
+
+def get_exact(path: Path, table: str, key: str, min_ts: int) -> Optional[str]:
+    """Return the value stored under the key if it was stored at or after min_ts."""
+    try:
+        with closing(_connect(path, table)) as conn:
+            row = conn.execute(
+                f"SELECT value FROM {table} WHERE key = ? AND ts >= ?", (key, min_ts)
+            ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning(f"Cache {table} unavailable: {str(e)}")
+        return None
+    return row[0] if row else None
+
+
+def get_similar(
+    path: Path, table: str, scope: str, embedding: Sequence[float], min_ts: int, threshold: float
+) -> Optional[str]:
+    """Return the value in the scope whose embedding is most similar to the given one, if above threshold."""
+    embedding = _normalized(embedding)
+    if not embedding:
+        return None
+    try:
+        with closing(_connect(path, table)) as conn:
+            rows = conn.execute(
+                f"SELECT value, emb FROM {table} WHERE scope = ? AND ts >= ? AND emb IS NOT NULL",
+                (scope, min_ts)
+            ).fetchall()
+    except sqlite3.Error as e:
+        logger.warning(f"Cache {table} unavailable: {str(e)}")
+        return None
+
+    best_score, best_value = threshold, None
+    for value, blob in rows:
+        stored = array('f', blob)
+        if len(stored) != len(embedding):
+            continue
+        score = sum(map(operator.mul, embedding, stored))
+        if score >= best_score:
+            best_score, best_value = score, value
+    return best_value
+
+
+def put(
+    path: Path, table: str, key: str, scope: str, value: str, ts: int, embedding: Optional[List[float]], ttl: int
+) -> None:
+    """Store the value under the key, with the embedding if there is one.
+    
+    Rows older than ttl seconds, and the oldest rows beyond MAX_ROWS, are deleted.
+    """
+    embedding = _normalized(embedding) if embedding else None
+    blob = array('f', embedding).tobytes() if embedding else None
+    try:
+        with closing(_connect(path, table)) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} (key, scope, value, ts, emb) VALUES (?, ?, ?, ?, ?)",
+                (key, scope, value, ts, blob)
+            )
+            conn.execute(f"DELETE FROM {table} WHERE ts < ?", (ts - ttl,))
+            conn.execute(
+                f"DELETE FROM {table} WHERE key IN (SELECT key FROM {table} ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                (MAX_ROWS,)
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to store value in cache {table}: {str(e)}")
+
+
+def _normalized(vector: Sequence[float]) -> List[float]:
+    """Scale the vector to unit length; a zero vector gives an empty list."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else []
+
+
+def _connect(path: Path, table: str) -> sqlite3.Connection:
+    path.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {table} "
+        "(key TEXT PRIMARY KEY, scope TEXT, value TEXT, ts INT, emb BLOB)"
+    )
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts)")
+    return conn
@@ -0,0 +1,35 @@
+from typing import Any, Dict
+
+# JSON Schema keywords accepted by OpenAI structured outputs
+_SCHEMA_KEYWORDS = {'type', 'properties', 'items', 'anyOf', 'description', 'enum', '$defs', '$ref'}
+
+
+def strict_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Adapt a Pydantic JSON schema for OpenAI strict mode: every property required, no extra keys."""
+
+    strict = {}
+    for key, value in schema.items():
+        if key not in _SCHEMA_KEYWORDS:
+            continue
+        if key in ('properties', '$defs'):
+            strict[key] = {name: strict_json_schema(sub) for name, sub in value.items()}
+        elif key == 'items':
+            strict[key] = strict_json_schema(value)
+        elif key == 'anyOf':
+            strict[key] = [strict_json_schema(sub) for sub in value]
+        else:
+            strict[key] = value
+
+    if 'properties' in strict:
+        strict['required'] = list(strict['properties'])
+        strict['additionalProperties'] = False
+
+    return strict
+
+
+def json_schema_response_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an OpenAI response_format that constrains output to the given JSON schema."""
+    return {
+        'type': 'json_schema',
+        'json_schema': {'name': name, 'schema': strict_json_schema(schema), 'strict': True}
+    }
@@ -1,16 +1,22 @@
 import time
+import asyncio
 import logging
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from src.models.research_result import ResearchResult
 from src.models.company import Company
 from src.agents.research_agent import ResearchAgent
-from src.agents.analysis_agent import AnalysisAgent
+from src.agents.analysis_agent import AnalysisAgent, FULL_REPORT_FAILED
 from src.utils.logger import setup_logger
 from src.utils.config import Config
+from src.utils.llm_client import get_embeddings
+from src.utils.query_cache import SemanticCache
 
 logger = setup_logger(__name__)
 
+REPORT_CACHE_SIZE = 64
+
 
 class Workflow:
     """Main workflow orchestrator for the document research agent."""
@@ -20,108 +26,304 @@ class Workflow:
         
         self.config = config or Config.from_env()
         
-        # Validate configuration
-        missing_keys = self.config.validate_keys()
-        if missing_keys:
-            raise ValueError(f"Missing required API keys: {', '.join(missing_keys)}")
+        # Validate configuration once; Config is frozen, so the result holds for the workflow's lifetime
+        self._missing_keys: Tuple[str, ...] = tuple(self.config.validate_keys())
+        if self._missing_keys:
+            raise ValueError(f"Missing required API keys: {', '.join(self._missing_keys)}")
         
         # Initialize agents
-        self.research_agent = ResearchAgent()
+        self.research_agent = ResearchAgent(self.config)
         self.analysis_agent = AnalysisAgent()
         
+        # Results of earlier runs, matched on exact or near-duplicate query text
+        self._query_cache = SemanticCache(get_embeddings("text-embedding-3-small"), threshold=0.95)
+        
+        # Full reports keyed by (companies fingerprint, query, requirements), least recently used first
+        self._reports: "OrderedDict[tuple, Dict[str, str]]" = OrderedDict()
+        
         logger.info("Workflow initialized successfully")
     
-    def run(self, query: str, max_results: int = 10) -> ResearchResult:
-        """Run the complete research workflow for a given query."""
+    def run(self, query: str, max_results: int = 10, analyze: bool = True) -> ResearchResult:
+        """Run the complete research workflow for a given query.
         
-        start_time = time.time()
+        Pass analyze=False to skip the analysis step, e.g. to stream it
+        afterwards with stream_analysis.
+        """
         
-        logger.info(f"Starting research workflow for query: '{query}'")
+        start_time = time.perf_counter()
+        
+        # Near-duplicate queries with the same options reuse an earlier result
+        cache_scope = f"{max_results}|{analyze}"
+        early_result = self._early_result(query, cache_scope, start_time)
+        if early_result is not None:
+            return early_result
+        
+        logger.info("Starting research workflow for query: '%s'", query)
         
         try:
             # Step 1: Research companies/tools
             logger.info("Step 1: Researching companies and tools...")
             companies = self.research_agent.search_companies(query, max_results)
-            
-            if not companies:
-                logger.warning("No companies found for the query")
-                return ResearchResult(
-                    query=query,
-                    companies=[],
-                    analysis="No companies or tools found for the given query. Please try a different search term.",
-                    total_results=0,
-                    search_time=time.time() - start_time
-                )
-            
-            logger.info(f"Found {len(companies)} companies")
-            
-            # Step 2: Analyze results
-            logger.info("Step 2: Analyzing research results...")
-            analysis = self.analysis_agent.analyze_companies(companies, query)
-            
-            # Step 3: Create final result
-            result = ResearchResult(
-                query=query,
-                companies=companies,
-                analysis=analysis,
-                total_results=len(companies),
-                search_time=time.time() - start_time
-            )
-            
-            logger.info(f"Research workflow completed in {result.search_time:.2f} seconds")
-            return result
-            
         except Exception as e:
-            logger.error(f"Error in research workflow: {str(e)}")
+            return self._failed_result(query, e, start_time)
+        
+        return self._complete(query, companies, analyze, cache_scope, start_time)
+    
+    async def arun(self, query: str, max_results: int = 10, analyze: bool = True) -> ResearchResult:
+        """Async version of run."""
+        return await asyncio.to_thread(self.run, query, max_results, analyze)
+    
+    def run_batch(self, queries: List[str], max_results: int = 10, analyze: bool = True) -> List[ResearchResult]:
+        """Run the research workflow for several queries at once, returning one result per query.
+        
+        Queries the query cache cannot answer are scraped side by side, each with one
+        FireCrawl batch job, and their LLM top-ups share a single request.
+        """
+        
+        start_time = time.perf_counter()
+        
+        cache_scope = f"{max_results}|{analyze}"
+        results = [self._early_result(query, cache_scope, start_time) for query in queries]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        logger.info("Starting research workflow for %d queries", len(pending))
+        
+        try:
+            found = self.research_agent.search_companies_batch([queries[index] for index in pending], max_results)
+        except Exception as e:
+            for index in pending:
+                results[index] = self._failed_result(queries[index], e, start_time)
+            return results
+        
+        for index, companies in zip(pending, found):
+            results[index] = self._complete(queries[index], companies, analyze, cache_scope, start_time)
+        
+        return results
+    
+    async def arun_batch(self, queries: List[str], max_results: int = 10, analyze: bool = True) -> List[ResearchResult]:
+        """Async version of run_batch."""
+        return await asyncio.to_thread(self.run_batch, queries, max_results, analyze)
+    
+    def _early_result(self, query: str, cache_scope: str, start_time: float) -> Optional[ResearchResult]:
+        """Return the result for an empty or already cached query, or None if it needs researching."""
+        
+        if not query or not query.strip():
+            logger.warning("Empty query, skipping research")
             return ResearchResult(
                 query=query,
                 companies=[],
-                analysis=f"Research failed due to an error: {str(e)}",
+                analysis="Empty query. Please provide a search term.",
                 total_results=0,
-                search_time=time.time() - start_time
+                search_time=time.perf_counter() - start_time
             )
+        
+        cached = self._query_cache.lookup(query, cache_scope)
+        if cached is not None:
+            logger.info("Serving query '%s' from the query cache", query)
+            return ResearchResult.model_validate_json(cached)
+        
+        return None
+    
+    def _failed_result(self, query: str, error: Exception, start_time: float) -> ResearchResult:
+        """Build the result for a query whose research raised an error."""
+        
+        logger.error("Error in research workflow: %s", error)
+        return ResearchResult(
+            query=query,
+            companies=[],
+            analysis=f"Research failed due to an error: {str(error)}",
+            total_results=0,
+            search_time=time.perf_counter() - start_time
+        )
+    
+    def _complete(
+        self, query: str, companies: List[Company], analyze: bool, cache_scope: str, start_time: float
+    ) -> ResearchResult:
+        """Analyze the companies found for a query and build its result, caching it if it is complete."""
+        
+        analysis = None
+        # Only cache complete results; failures and empty searches should be retried
+        cacheable = bool(companies)
+        
+        if not companies:
+            logger.warning("No companies found for the query")
+            analysis = "No companies or tools found for the given query. Please try a different search term."
+        else:
+            logger.info("Found %d companies", len(companies))
+            
+            # Step 2: Analyze results
+            if analyze:
+                logger.info("Step 2: Analyzing research results...")
+                try:
+                    analysis = self.analysis_agent.analyze_companies(companies, query, raise_on_error=True)
+                except Exception as e:
+                    logger.error("Error analyzing research results: %s", e)
+                    analysis = "Analysis failed due to an error."
+                    cacheable = False
+        
+        # Step 3: Create final result
+        result = ResearchResult(
+            query=query,
+            companies=companies,
+            analysis=analysis,
+            total_results=len(companies),
+            search_time=time.perf_counter() - start_time
+        )
+        
+        logger.info("Research workflow completed in %.2f seconds", result.search_time)
+        
+        if cacheable:
+            self._query_cache.store(query, result.model_dump_json(), cache_scope)
+        
+        return result
+    
+    def stream_analysis(self, companies: List[Company], query: str) -> Iterator[str]:
+        """Stream the analysis of research results as it is generated."""
+        
+        logger.info("Streaming analysis of %d companies", len(companies))
+        
+        return self.analysis_agent.analyze_companies_stream(companies, query)
     
     def research_company(self, company_name: str, website: str = None) -> Optional[Company]:
         """Research detailed information about a specific company."""
         
-        logger.info(f"Researching specific company: {company_name}")
+        logger.info("Researching specific company: %s", company_name)
         
         try:
             return self.research_agent.get_company_details(company_name, website)
         except Exception as e:
-            logger.error(f"Error researching company {company_name}: {str(e)}")
+            logger.error("Error researching company %s: %s", company_name, e)
             return None
     
+    async def aresearch_company(self, company_name: str, website: str = None) -> Optional[Company]:
+        """Async version of research_company."""
+        return await asyncio.to_thread(self.research_company, company_name, website)
+    
     def compare_companies(self, companies: List[Company], criteria: List[str] = None) -> str:
-        """Compare multiple companies based on given criteria."""
+        """Compare multiple companies based on given criteria.
         
-        logger.info(f"Comparing {len(companies)} companies")
+        With the default criteria, the comparison of an earlier full_report for the
+        same companies is reused.
+        """
+        
+        logger.info("Comparing %d companies", len(companies))
+        
+        if criteria is None:
+            memoized = self._memoized_report(companies)
+            if memoized is not None:
+                return memoized["comparison"]
         
         try:
             return self.analysis_agent.compare_companies(companies, criteria)
         except Exception as e:
-            logger.error(f"Error comparing companies: {str(e)}")
+            logger.error("Error comparing companies: %s", e)
             return "Comparison failed due to an error."
     
+    async def acompare_companies(self, companies: List[Company], criteria: List[str] = None) -> str:
+        """Async version of compare_companies."""
+        return await asyncio.to_thread(self.compare_companies, companies, criteria)
+    
     def get_recommendations(self, companies: List[Company], user_requirements: str = None) -> str:
-        """Get personalized recommendations based on user requirements."""
+        """Get personalized recommendations based on user requirements.
+        
+        The recommendations of an earlier full_report for the same companies and
+        requirements are reused.
+        """
         
         logger.info("Generating personalized recommendations")
         
+        memoized = self._memoized_report(companies, user_requirements, match_requirements=True)
+        if memoized is not None:
+            return memoized["recommendations"]
+        
         try:
             return self.analysis_agent.generate_recommendations(companies, user_requirements)
         except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}")
+            logger.error("Error generating recommendations: %s", e)
             return "Recommendations failed due to an error."
     
+    async def aget_recommendations(self, companies: List[Company], user_requirements: str = None) -> str:
+        """Async version of get_recommendations."""
+        return await asyncio.to_thread(self.get_recommendations, companies, user_requirements)
+    
+    def full_report(self, companies: List[Company], query: str, user_requirements: str = None) -> Dict[str, str]:
+        """Get the analysis, comparison and recommendations for companies from one shared LLM call.
+        
+        Reports are memoized per set of companies, query and requirements, so
+        asking again for the same results does not hit the LLM.
+        """
+        
+        key = (self._fingerprint(companies), query, user_requirements)
+        
+        if key in self._reports:
+            self._reports.move_to_end(key)
+            return self._reports[key]
+        
+        logger.info("Generating full report for %d companies", len(companies))
+        
+        report = self.analysis_agent.full_report(companies, query, user_requirements)
+        
+        # Don't memoize failures, so the next call can retry
+        if report != FULL_REPORT_FAILED:
+            self._reports[key] = report
+            if len(self._reports) > REPORT_CACHE_SIZE:
+                self._reports.popitem(last=False)
+        
+        return report
+    
+    async def afull_report(self, companies: List[Company], query: str, user_requirements: str = None) -> Dict[str, str]:
+        """Async version of full_report."""
+        return await asyncio.to_thread(self.full_report, companies, query, user_requirements)
+    
+    def _memoized_report(
+        self, companies: List[Company], user_requirements: str = None, match_requirements: bool = False
+    ) -> Optional[Dict[str, str]]:
+        """Return the most recent memoized full report for the companies, for any query.
+        
+        Set match_requirements to only accept a report made for the same user requirements.
+        """
+        
+        fingerprint = self._fingerprint(companies)
+        for (report_fingerprint, _, report_requirements), report in reversed(self._reports.items()):
+            if report_fingerprint == fingerprint and (not match_requirements or report_requirements == user_requirements):
+                return report
+        return None
+    
+    @staticmethod
+    def _fingerprint(companies: List[Company]) -> tuple:
+        return tuple(sorted((c.name, c.website or '') for c in companies))
+    
     def search_by_category(self, category: str, max_results: int = 10) -> ResearchResult:
         """Search for companies/tools in a specific category."""
         
         query = f"{category} tools and companies"
         return self.run(query, max_results)
     
+    async def asearch_by_category(self, category: str, max_results: int = 10) -> ResearchResult:
+        """Async version of search_by_category."""
+        return await asyncio.to_thread(self.search_by_category, category, max_results)
+    
+    def search_by_categories(self, categories: List[str], max_results: int = 10) -> List[ResearchResult]:
+        """Search for companies/tools in several categories at once, see run_batch."""
+        
+        return self.run_batch([f"{category} tools and companies" for category in categories], max_results)
+    
+    async def asearch_by_categories(self, categories: List[str], max_results: int = 10) -> List[ResearchResult]:
+        """Async version of search_by_categories."""
+        return await asyncio.to_thread(self.search_by_categories, categories, max_results)
+    
+    def close(self) -> None:
+        """Release the thread and connection pools held by the agents."""
+        self.research_agent.web_scraper.close()
+    
     def health_check(self) -> dict:
         """Perform a health check of the system."""
+        return asyncio.run(self.health_check_async())
+    
+    async def health_check_async(self) -> dict:
+        """Async version of health_check that runs the component probes concurrently."""
         
         logger.info("Performing health check")
         
@@ -131,30 +333,40 @@ class Workflow:
             "timestamp": time.time()
         }
         
-        # Check OpenAI API
+        probes = await asyncio.gather(
+            self._probe_openai(),
+            self._probe_firecrawl(),
+            self._probe_config()
+        )
+        
+        # A failed API probe degrades the system; missing configuration makes it unhealthy
+        for name, status, failure_status in probes:
+            health_status["components"][name] = status
+            if failure_status == "unhealthy" or (failure_status and health_status["status"] == "healthy"):
+                health_status["status"] = failure_status
+        
+        logger.info("Health check completed: %s", health_status['status'])
+        return health_status
+    
+    async def _probe_openai(self) -> Tuple[str, str, Optional[str]]:
+        """Check the OpenAI API, returning (component, status, overall status on failure)."""
         try:
-            self.research_agent.llm.invoke([{"role": "user", "content": "test"}])
-            health_status["components"]["openai"] = "healthy"
+            await self.research_agent.llm.ainvoke([{"role": "user", "content": "test"}])
+            return "openai", "healthy", None
         except Exception as e:
-            health_status["components"]["openai"] = f"unhealthy: {str(e)}"
-            health_status["status"] = "degraded"
-        
-        # Check FireCrawl API
+            return "openai", f"unhealthy: {str(e)}", "degraded"
+    
+    async def _probe_firecrawl(self) -> Tuple[str, str, Optional[str]]:
+        """Check the FireCrawl client, returning (component, status, overall status on failure)."""
         try:
             # This is a simple check - in practice you might want to test with a real URL
             self.research_agent.web_scraper.firecrawl_app
-            health_status["components"]["firecrawl"] = "healthy"
+            return "firecrawl", "healthy", None
         except Exception as e:
-            health_status["components"]["firecrawl"] = f"unhealthy: {str(e)}"
-            health_status["status"] = "degraded"
-        
-        # Check configuration
-        missing_keys = self.config.validate_keys()
-        if missing_keys:
-            health_status["components"]["config"] = f"missing keys: {', '.join(missing_keys)}"
-            health_status["status"] = "unhealthy"
-        else:
-            health_status["components"]["config"] = "healthy"
-        
-        logger.info(f"Health check completed: {health_status['status']}")
-        return health_status
+            return "firecrawl", f"unhealthy: {str(e)}", "degraded"
+    
+    async def _probe_config(self) -> Tuple[str, str, Optional[str]]:
+        """Check the configuration, returning (component, status, overall status on failure)."""
+        if self._missing_keys:
+            return "config", f"missing keys: {', '.join(self._missing_keys)}", "unhealthy"
+        return "config", "healthy", None
@@ -0,0 +1,29 @@
+from unittest.mock import Mock
+
+import pytest
+
+from src.tools.web_scraper import WebScraperTool
+from src.utils import llm_cache, query_cache, scrape_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_path(tmp_path, monkeypatch):
+    """Keep every sqlite cache in the test's temporary directory instead of ./cache."""
+    monkeypatch.setattr(llm_cache, 'CACHE_PATH', tmp_path / "llm_cache.sqlite3")
+    monkeypatch.setattr(query_cache, 'CACHE_PATH', tmp_path / "query_cache.sqlite3")
+    monkeypatch.setattr(scrape_cache, 'CACHE_PATH', tmp_path / "scrape_cache.sqlite3")
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    """A WebScraperTool whose FireCrawl client is a mock returning one successful scrape."""
+    monkeypatch.setenv("FIRECRAWL_API_KEY", "test_key")
+    scraper = WebScraperTool()
+    scraper.firecrawl_app = Mock(api_url="https://api.firecrawl.dev", api_key="test_key")
+    scraper.firecrawl_app.scrape_url.return_value = {
+        'success': True,
+        'markdown': '# Tool',
+        'extract': {'company_name': 'Tool'},
+        'metadata': {}
+    }
+    return scraper
@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import httpx
+from openai import RateLimitError
+from tenacity import wait_none
+from langchain.schema import AIMessage, HumanMessage, SystemMessage
+
+from src.utils import llm_cache
+from src.utils.llm_cache import cached_invoke, cached_stream
+
+
+class TestCachedInvoke:
+    """Test cases for the LLM response cache."""
+
+    def test_identical_prompt_is_served_from_cache(self):
+        """Test that a repeated prompt does not invoke the LLM again."""
+        llm = Mock()
+        llm.invoke.return_value = AIMessage(content="answer")
+        messages = [SystemMessage(content="system"), HumanMessage(content="question")]
+
+        first = cached_invoke(llm, messages)
+        second = cached_invoke(llm, messages)
+
+        assert first.content == second.content == "answer"
+        assert llm.invoke.call_count == 1
+
+    def test_expired_entry_is_recomputed(self):
+        """Test that entries older than the TTL are ignored."""
+        llm = Mock()
+        llm.invoke.return_value = AIMessage(content="answer")
+        messages = [HumanMessage(content="question")]
+
+        cached_invoke(llm, messages)
+        cached_invoke(llm, messages, ttl=-1)
+
+        assert llm.invoke.call_count == 2
+
+    def test_similar_prompt_hits_semantic_cache(self):
+        """Test that a paraphrased prompt with the same instructions reuses the cached response."""
+        llm = Mock()
+        llm.invoke.return_value = AIMessage(content="answer")
+        embeddings = Mock()
+        embeddings.embed_query.side_effect = [[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]]
+
+        cached_invoke(llm, [SystemMessage(content="system"), HumanMessage(content="vector db tools")], embeddings=embeddings)
+        hit = cached_invoke(llm, [SystemMessage(content="system"), HumanMessage(content="vector database tools")], embeddings=embeddings)
+        cached_invoke(llm, [SystemMessage(content="system"), HumanMessage(content="CI/CD tools")], embeddings=embeddings)
+
+        assert hit.content == "answer"
+        assert llm.invoke.call_count == 2
+
+    def test_response_failing_validation_is_not_cached(self):
+        """Test that a response the caller cannot parse is retried instead of served from cache."""
+        llm = Mock()
+        llm.invoke.side_effect = [AIMessage(content='{"trunc'), AIMessage(content='{}')]
+        messages = [HumanMessage(content="question")]
+
+        assert cached_invoke(llm, messages, validate=json.loads).content == '{"trunc'
+        assert cached_invoke(llm, messages, validate=json.loads).content == '{}'
+        assert cached_invoke(llm, messages, validate=json.loads).content == '{}'
+        assert llm.invoke.call_count == 2
+
+    def test_streamed_response_is_cached(self):
+        """Test that a fully streamed response is replayed from cache as one chunk."""
+        llm = Mock()
+        llm.stream.return_value = iter([AIMessage(content="ans"), AIMessage(content="wer")])
+        messages = [HumanMessage(content="question")]
+
+        assert list(cached_stream(llm, messages)) == ["ans", "wer"]
+        assert list(cached_stream(llm, messages)) == ["answer"]
+        assert llm.stream.call_count == 1
+
+    def test_rate_limited_call_is_retried(self, monkeypatch):
+        """Test that a 429 from the API is retried instead of surfacing to the caller."""
+        monkeypatch.setattr(llm_cache._invoke.retry, 'wait', wait_none())
+        response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        llm = Mock()
+        llm.invoke.side_effect = [RateLimitError("rate limited", response=response, body=None), AIMessage(content="answer")]
+
+        assert cached_invoke(llm, [HumanMessage(content="question")]).content == "answer"
+        assert llm.invoke.call_count == 2
+
+    def test_concurrent_identical_prompts_share_one_call(self):
+        """Test that identical prompts issued concurrently make a single API call."""
+        release = threading.Event()
+        llm = Mock()
+        llm.invoke.side_effect = lambda messages: release.wait(5) and AIMessage(content="answer")
+        messages = [HumanMessage(content="question")]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(cached_invoke, llm, messages) for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert all(result.content == "answer" for result in results)
+        assert llm.invoke.call_count == 1
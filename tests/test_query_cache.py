@@ -0,0 +1,38 @@
+from unittest.mock import Mock
+
+from src.utils.query_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Test cases for the query-level semantic cache."""
+
+    def test_normalized_query_is_exact_hit(self):
+        """Test that case and whitespace differences do not miss the cache or need an embedding."""
+        embeddings = Mock()
+        embeddings.embed_query.return_value = [1.0, 0.0]
+        cache = SemanticCache(embeddings)
+
+        cache.store("Vector DB tools", "result")
+
+        assert cache.lookup("  vector  db TOOLS ") == "result"
+        assert embeddings.embed_query.call_count == 1
+
+    def test_similar_query_hits_semantic_tier(self):
+        """Test that a paraphrased query reuses the stored payload and an unrelated one does not."""
+        embeddings = Mock()
+        embeddings.embed_query.side_effect = [[1.0, 0.0], [0.99, 0.01], [0.0, 1.0]]
+        cache = SemanticCache(embeddings)
+
+        cache.store("vector db tools", "result")
+
+        assert cache.lookup("vector database tools") == "result"
+        assert cache.lookup("CI/CD tools") is None
+
+    def test_scopes_are_isolated(self):
+        """Test that payloads stored under one scope are not returned for another."""
+        cache = SemanticCache()
+
+        cache.store("vector db tools", "result", scope="10|True")
+
+        assert cache.lookup("vector db tools", scope="10|True") == "result"
+        assert cache.lookup("vector db tools", scope="5|True") is None
@@ -0,0 +1,48 @@
+import asyncio
+import dataclasses
+
+import pytest
+
+from src.agents.research_agent import ResearchAgent
+from src.utils.config import Config
+
+
+class TestResearchAgent:
+    """Test cases for the ResearchAgent class."""
+
+    @pytest.fixture
+    def config(self, monkeypatch):
+        monkeypatch.setenv("FIRECRAWL_API_KEY", "test_key")
+        return dataclasses.replace(Config.from_env(), max_scraping_concurrent=2)
+
+    def test_config_is_passed_to_the_web_scraper(self, config):
+        """Test that the scraper uses the agent's configuration instead of re-reading the environment."""
+        assert ResearchAgent(config).web_scraper.config is config
+
+    def test_batch_search_shares_one_scrape_bound(self, config, monkeypatch):
+        """Test that the queries of a batch together stay within max_scraping_concurrent scrapes."""
+        agent = ResearchAgent(config)
+        scraper = agent.web_scraper
+        running, peak = 0, 0
+
+        async def scrape(url, force_rescrape=False, client=None, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {'success': False, 'url': url, 'error': 'skipped'}
+
+        async def batch_job(urls, client):
+            raise RuntimeError("no batch")
+
+        async def generate(items):
+            return [[] for _ in items]
+
+        monkeypatch.setattr(scraper, '_search_urls', lambda query, max_results: [f"https://{query}{i}.io" for i in range(3)])
+        monkeypatch.setattr(scraper, '_arun', scrape)
+        monkeypatch.setattr(scraper, '_abatch_scrape_job', batch_job)
+        monkeypatch.setattr(agent, 'agenerate_companies_batch', generate)
+
+        assert agent.search_companies_batch(["a", "b", "c"], 3) == [[], [], []]
+        assert peak == 2
@@ -0,0 +1,56 @@
+import asyncio
+
+import httpx
+
+from src.utils import scrape_cache
+
+
+class TestScrapeCache:
+    """Test cases for the FireCrawl scrape cache."""
+
+    def test_repeated_url_is_served_from_cache(self, scraper):
+        """Test that scraping the same URL twice only calls FireCrawl once."""
+        first = scraper._run("https://example.com")
+        second = scraper._run("https://example.com")
+
+        assert first == second
+        assert second['extracted_data'] == {'company_name': 'Tool'}
+        assert scraper.firecrawl_app.scrape_url.call_count == 1
+
+    def test_force_rescrape_bypasses_cache(self, scraper):
+        """Test that force_rescrape always hits FireCrawl."""
+        scraper._run("https://example.com")
+        scraper._run("https://example.com", force_rescrape=True)
+
+        assert scraper.firecrawl_app.scrape_url.call_count == 2
+
+    def test_failed_scrape_is_not_cached(self, scraper):
+        """Test that failures are retried on the next call."""
+        scraper.firecrawl_app.scrape_url.return_value = {'success': False, 'error': 'timeout'}
+
+        scraper._run("https://example.com")
+        scraper._run("https://example.com")
+
+        assert scraper.firecrawl_app.scrape_url.call_count == 2
+
+    def test_schema_version_is_part_of_key(self):
+        """Test that different extraction schemas do not share cache entries."""
+        assert scrape_cache.scrape_cache_key("https://github.com/a/b", "company-schema") != \
+            scrape_cache.scrape_cache_key("https://github.com/a/b", "github-schema")
+
+    def test_async_scrape_is_cached(self, scraper):
+        """Test that the async scrape path stores and reuses results the same way."""
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, json={'success': True, 'data': {'markdown': '# Tool', 'extract': {'company_name': 'Tool'}}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        first = asyncio.run(scraper._arun("https://example.com", client=client))
+
+        assert first['extracted_data'] == {'company_name': 'Tool'}
+        assert scraper._run("https://example.com") == first
+        assert len(requests_seen) == 1
+        assert scraper.firecrawl_app.scrape_url.call_count == 0
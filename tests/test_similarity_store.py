@@ -0,0 +1,38 @@
+from contextlib import closing
+
+from src.utils import similarity_store
+
+
+class TestSimilarityStore:
+    """Test cases for the sqlite store behind the LLM and query caches."""
+
+    def count(self, path):
+        with closing(similarity_store._connect(path, "entries")) as conn:
+            return conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def test_expired_rows_are_purged_on_put(self, tmp_path):
+        """Test that writing a row deletes the rows older than the TTL."""
+        path = tmp_path / "store.sqlite3"
+        similarity_store.put(path, "entries", "old", "", "old", 100, None, ttl=60)
+        similarity_store.put(path, "entries", "new", "", "new", 200, None, ttl=60)
+
+        assert self.count(path) == 1
+        assert similarity_store.get_exact(path, "entries", "new", 0) == "new"
+
+    def test_row_count_is_capped(self, tmp_path, monkeypatch):
+        """Test that only the newest MAX_ROWS rows are kept."""
+        monkeypatch.setattr(similarity_store, 'MAX_ROWS', 2)
+        path = tmp_path / "store.sqlite3"
+        for ts in range(3):
+            similarity_store.put(path, "entries", f"k{ts}", "", "v", ts, None, ttl=60)
+
+        assert self.count(path) == 2
+        assert similarity_store.get_exact(path, "entries", "k0", 0) is None
+
+    def test_similarity_ignores_vector_length(self, tmp_path):
+        """Test that stored embeddings are normalized, so scaled vectors still match."""
+        path = tmp_path / "store.sqlite3"
+        similarity_store.put(path, "entries", "k", "s", "v", 100, [3.0, 4.0], ttl=60)
+
+        assert similarity_store.get_similar(path, "entries", "s", [0.6, 0.8], 0, 0.99) == "v"
+        assert similarity_store.get_similar(path, "entries", "s", [4.0, -3.0], 0, 0.99) is None
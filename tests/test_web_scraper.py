@@ -0,0 +1,117 @@
+import asyncio
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import firecrawl.firecrawl as firecrawl_sdk
+import httpx
+import requests
+
+from src.tools import web_scraper
+from src.tools.web_scraper import WebScraperTool
+
+
+class TestWebScraperTool:
+    """Test cases for the WebScraperTool class."""
+
+    def test_domain_filter_is_opt_in(self, scraper):
+        """Test that search results outside include_domains are kept unless filter_include_domains is set."""
+        scraper.firecrawl_app.search.return_value = {'success': True, 'data': [
+            {'url': "https://github.com/a/b"},
+            {'url': "https://docs.github.com:443/x"},
+            {'url': "https://example.com"}
+        ]}
+
+        assert scraper._search_urls("tools", 3) == ["https://github.com/a/b", "https://docs.github.com:443/x", "https://example.com"]
+
+        scraper.config = dataclasses.replace(scraper.config, filter_include_domains=True)
+
+        assert scraper._search_urls("tools", 3) == ["https://github.com/a/b", "https://docs.github.com:443/x"]
+
+    def test_firecrawl_calls_use_the_instance_session(self, monkeypatch):
+        """Test that the tool's FireCrawl client pools its own connections without patching the SDK module."""
+        monkeypatch.setenv("FIRECRAWL_API_KEY", "test_key")
+        app = WebScraperTool().firecrawl_app
+        response = Mock()
+        response.json.return_value = {'success': True, 'data': {'extract': {'company_name': 'Tool'}}}
+        app._session.post = Mock(return_value=response)
+
+        result = app.scrape_url("https://example.com", params={'formats': ['extract']})
+
+        assert result == {'success': True, 'extract': {'company_name': 'Tool'}}
+        assert app._session.post.call_args.kwargs['json'] == {'url': "https://example.com", 'formats': ['extract']}
+        assert firecrawl_sdk.requests is requests
+
+    def test_batch_scrape_falls_back_for_missing_urls(self, scraper, monkeypatch):
+        """Test that one batch job covers the URLs and any it drops are scraped individually."""
+        monkeypatch.setattr(web_scraper, 'BATCH_POLL_INITIAL_DELAY', 0)
+        paths = []
+
+        def handler(request):
+            paths.append(request.url.path)
+            if request.url.path == "/v1/batch/scrape":
+                return httpx.Response(200, json={'success': True, 'id': 'job'})
+            if request.url.path == "/v1/batch/scrape/job":
+                return httpx.Response(200, json={'success': True, 'status': 'completed', 'data': [
+                    {'extract': {'company_name': 'A'}, 'metadata': {'sourceURL': 'https://a.io/'}}
+                ]})
+            return httpx.Response(200, json={'success': True, 'data': {'extract': {'company_name': 'B'}}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        results = asyncio.run(scraper._abatch_scrape(["https://a.io", "https://b.io"], client))
+
+        assert [result['extracted_data']['company_name'] for result in results] == ['A', 'B']
+        assert [result['url'] for result in results] == ["https://a.io", "https://b.io"]
+        assert paths == ["/v1/batch/scrape", "/v1/batch/scrape/job", "/v1/scrape"]
+
+    def test_timed_out_batch_is_cancelled_and_partial_results_kept(self, scraper, monkeypatch):
+        """Test that a batch job past its deadline is cancelled and only its unfinished URLs are re-scraped."""
+        monkeypatch.setattr(web_scraper, 'BATCH_POLL_INITIAL_DELAY', 0)
+        scraper.config = dataclasses.replace(scraper.config, batch_scrape_timeout=0)
+        calls = []
+
+        def handler(request):
+            calls.append((request.method, request.url.path))
+            if request.url.path == "/v1/batch/scrape":
+                return httpx.Response(200, json={'success': True, 'id': 'job'})
+            if request.url.path == "/v1/batch/scrape/job":
+                return httpx.Response(200, json={'success': True, 'status': 'scraping', 'data': [
+                    {'extract': {'company_name': 'A'}, 'metadata': {'sourceURL': 'https://a.io'}}
+                ]})
+            return httpx.Response(200, json={'success': True, 'data': {'extract': {'company_name': 'B'}}})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        results = asyncio.run(scraper._abatch_scrape(["https://a.io", "https://b.io"], client))
+
+        assert [result['extracted_data']['company_name'] for result in results] == ['A', 'B']
+        assert calls == [
+            ("POST", "/v1/batch/scrape"),
+            ("GET", "/v1/batch/scrape/job"),
+            ("DELETE", "/v1/batch/scrape/job"),
+            ("POST", "/v1/scrape")
+        ]
+
+    def test_search_and_scrape_closes_its_http_client(self, scraper, monkeypatch):
+        """Test that each top-level scrape closes the connection pool it opened."""
+        client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={'success': True, 'data': {'extract': {'company_name': 'A'}}})
+        ))
+        monkeypatch.setattr(web_scraper, '_async_http_client', lambda timeout: client)
+        monkeypatch.setattr(scraper, '_search_urls', lambda query, max_results: ["https://a.io"])
+
+        results = scraper.search_and_scrape("tools")
+
+        assert results[0]['extracted_data'] == {'company_name': 'A'}
+        assert client.is_closed
+
+    def test_blocking_executor_is_created_once_and_closed(self, scraper):
+        """Test that concurrent callers share one thread pool and close() shuts it down."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            executors = set(pool.map(lambda _: scraper._blocking_executor(), range(8)))
+
+        assert len(executors) == 1
+        scraper.close()
+        assert executors.pop()._shutdown
+        assert scraper._executor is None
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from src.workflow import Workflow
 from src.models.company import Company
 from src.models.research_result import ResearchResult
@@ -31,13 +31,16 @@ class TestWorkflow:
                     
                     # Mock the health check components
                     with patch.object(workflow, 'research_agent') as mock_research:
-                        mock_research.llm.invoke.return_value = Mock()
+                        mock_research.llm.ainvoke = AsyncMock(return_value=Mock())
                         mock_research.web_scraper.firecrawl_app = Mock()
                         
                         health = workflow.health_check()
                         
                         assert 'status' in health
                         assert 'components' in health
+                        assert health['status'] == 'healthy'
+                        assert health['components']['openai'] == 'healthy'
+                        mock_research.llm.ainvoke.assert_awaited_once()
                         assert 'timestamp' in health
 
     def test_run_with_empty_query(self):
@@ -45,8 +48,8 @@ class TestWorkflow:
         with patch('src.utils.config.Config.from_env') as mock_config:
             mock_config.return_value = Mock(validate_keys=Mock(return_value=[]))
             
-            with patch('src.agents.research_agent.ResearchAgent') as mock_research_agent:
-                with patch('src.agents.analysis_agent.AnalysisAgent') as mock_analysis_agent:
+            with patch('src.workflow.ResearchAgent') as mock_research_agent:
+                with patch('src.workflow.AnalysisAgent') as mock_analysis_agent:
                     # Mock the research agent to return empty results
                     mock_research_instance = Mock()
                     mock_research_instance.search_companies.return_value = []
@@ -60,6 +63,7 @@ class TestWorkflow:
                     
                     assert isinstance(result, ResearchResult)
                     assert result.total_results == 0
+                    mock_research_instance.search_companies.assert_not_called()
 
     def test_run_with_valid_query(self):
         """Test workflow with a valid query."""
@@ -95,6 +99,86 @@ class TestWorkflow:
                     assert result.companies[0].name == "Test Company"
                     assert result.analysis == "Test analysis"
 
+    def test_run_batch_searches_pending_queries_together(self):
+        """Test that run_batch researches all uncached queries with one batched search."""
+        with patch('src.utils.config.Config.from_env') as mock_config:
+            mock_config.return_value = Mock(validate_keys=Mock(return_value=[]))
+            
+            with patch('src.workflow.ResearchAgent') as mock_research_agent, \
+                    patch('src.workflow.AnalysisAgent') as mock_analysis_agent, \
+                    patch('src.workflow.SemanticCache') as mock_query_cache, \
+                    patch('src.workflow.get_embeddings'):
+                mock_query_cache.return_value.lookup.return_value = None
+                
+                mock_research_instance = Mock()
+                mock_research_instance.search_companies_batch.return_value = [
+                    [Company(name="A", website="https://a.io")],
+                    []
+                ]
+                mock_research_agent.return_value = mock_research_instance
+                
+                mock_analysis_instance = Mock()
+                mock_analysis_instance.analyze_companies.return_value = "Test analysis"
+                mock_analysis_agent.return_value = mock_analysis_instance
+                
+                workflow = Workflow()
+                results = workflow.run_batch(["first query", "", "second query"])
+                
+                assert [result.total_results for result in results] == [1, 0, 0]
+                assert results[0].analysis == "Test analysis"
+                assert results[1].analysis == "Empty query. Please provide a search term."
+                mock_research_instance.search_companies_batch.assert_called_once_with(
+                    ["first query", "second query"], 10
+                )
+                mock_research_instance.search_companies.assert_not_called()
+
+    def test_failed_analysis_is_not_cached(self):
+        """Test that a run whose analysis raised keeps its companies but is not stored in the query cache."""
+        with patch('src.utils.config.Config.from_env') as mock_config:
+            mock_config.return_value = Mock(validate_keys=Mock(return_value=[]))
+            
+            with patch('src.workflow.ResearchAgent') as mock_research_agent, \
+                    patch('src.workflow.AnalysisAgent') as mock_analysis_agent, \
+                    patch('src.workflow.SemanticCache') as mock_query_cache, \
+                    patch('src.workflow.get_embeddings'):
+                mock_query_cache.return_value.lookup.return_value = None
+                mock_research_agent.return_value.search_companies.return_value = [
+                    Company(name="A", website="https://a.io")
+                ]
+                mock_analysis_agent.return_value.analyze_companies.side_effect = RuntimeError("boom")
+                
+                workflow = Workflow()
+                result = workflow.run("test query")
+                
+                assert result.total_results == 1
+                assert result.analysis == "Analysis failed due to an error."
+                mock_query_cache.return_value.store.assert_not_called()
+
+    def test_full_report_serves_comparison_and_recommendations(self):
+        """Test that a memoized full report answers matching comparison and recommendation requests."""
+        with patch('src.utils.config.Config.from_env') as mock_config:
+            mock_config.return_value = Mock(validate_keys=Mock(return_value=[]))
+            
+            with patch('src.workflow.ResearchAgent'), \
+                    patch('src.workflow.AnalysisAgent') as mock_analysis_agent, \
+                    patch('src.workflow.SemanticCache'), \
+                    patch('src.workflow.get_embeddings'):
+                mock_analysis_instance = mock_analysis_agent.return_value
+                mock_analysis_instance.full_report.return_value = {
+                    "analysis": "analysis", "comparison": "comparison", "recommendations": "recommendations"
+                }
+                mock_analysis_instance.generate_recommendations.return_value = "fresh recommendations"
+                companies = [Company(name="A", website="https://a.io"), Company(name="B", website="https://b.io")]
+                
+                workflow = Workflow()
+                workflow.full_report(companies, "test query", "free")
+                
+                assert workflow.compare_companies(list(reversed(companies))) == "comparison"
+                assert workflow.get_recommendations(companies, "free") == "recommendations"
+                assert workflow.get_recommendations(companies, "paid") == "fresh recommendations"
+                mock_analysis_instance.compare_companies.assert_not_called()
+                mock_analysis_instance.generate_recommendations.assert_called_once_with(companies, "paid")
+
     def test_config_validation_error(self):
         """Test that workflow raises error when API keys are missing."""
         with patch('src.utils.config.Config.from_env') as mock_config: